@@ -0,0 +1,108 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Runs the benchmark suite and compares the results to the reference numbers.
+
+Usage from the repository root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --compare benchmarks/reference.json
+    python -m benchmarks.run --save benchmarks/reference.json
+"""
+import json
+import os
+import platform
+import statistics
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Annotated, List, Optional
+
+# Thirdparty
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.suite import BENCHMARKS
+
+console = Console()
+
+
+def run_benchmark(name: str, scale: int, repeat: int) -> dict:
+    """Builds the configuration tree of the benchmark into a temporary directory and times the operation.
+
+    :return: Minimum and median wall time of a single run in seconds
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        operation = BENCHMARKS[name](Path(directory), scale)
+        operation()  # Warm-up, so that the imports and the module level caches are not measured
+        times = timeit.repeat(operation, number=1, repeat=repeat)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def main(  # pylint: disable=too-many-arguments,too-many-locals
+    names: Annotated[Optional[List[str]], typer.Argument(help="benchmarks to run, all by default")] = None,
+    *,
+    scale: Annotated[int, typer.Option(help="size multiplier of the synthetic configuration trees")] = 1,
+    repeat: Annotated[int, typer.Option(help="number of timed runs per benchmark")] = 10,
+    save: Annotated[Optional[Path], typer.Option(help="write the results to a JSON file")] = None,
+    compare: Annotated[Optional[Path], typer.Option(help="compare the results to a JSON file")] = None,
+    tolerance: Annotated[float, typer.Option(help="allowed relative slowdown before failing the comparison")] = 0.2,
+):
+    """Runs the benchmarks and prints the results.
+
+    \f
+    :raises typer.BadParameter: If a benchmark is unknown or the reference was measured with a different scale
+    :raises typer.Exit: If a benchmark is slower than the reference by more than the tolerance
+    """
+    unknown = set(names or []) - set(BENCHMARKS)
+    if unknown:
+        raise typer.BadParameter(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    os.environ.pop("PARAM_CACHE_DIR", None)  # Measure the resolution, not the persistent cache
+    reference = {}
+    if compare:
+        reference_file = json.loads(compare.read_text(encoding="utf-8"))
+        if reference_file["scale"] != scale:
+            raise typer.BadParameter(f"The reference numbers in {compare} were measured with a different scale")
+        reference = reference_file["results"]
+
+    table = Table("Benchmark", "Min (ms)", "Median (ms)", "Reference (ms)", "Change")
+    results = {}
+    regressions = []
+    for name in names or BENCHMARKS:
+        results[name] = run_benchmark(name, scale=scale, repeat=repeat)
+        row = [name, f"{results[name]['min'] * 1000:.2f}", f"{results[name]['median'] * 1000:.2f}", "", ""]
+        if name in reference:
+            change = results[name]["min"] / reference[name]["min"] - 1
+            color = "red" if change > tolerance else "green" if change < -tolerance else "white"
+            row[3:] = [f"{reference[name]['min'] * 1000:.2f}", f"[{color}]{change:+.0%}"]
+            if change > tolerance:
+                regressions.append(name)
+        table.add_row(*row)
+    console.print(table)
+
+    if save:
+        machine = {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+        save.write_text(
+            json.dumps({"scale": scale, "machine": machine, "results": results}, indent=2) + "\n", encoding="utf-8"
+        )
+    if regressions:
+        console.print(f"[bold][red] Slower than the reference: {', '.join(regressions)}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,239 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Synthetic configuration trees and the benchmarked operations.
+
+Every benchmark is a setup function that builds its configuration tree into the given directory, scaled by the given
+factor, and returns the operation to time.
+"""
+import os
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any, Callable
+
+# Parameter Configuration
+from param_configuration.config_layers.archive_layer import ArchiveLayer
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.configuration import Configuration, get_resolved_yamls
+from param_configuration.fleet import FleetRenderer
+from param_configuration.snapshot import read_snapshot, write_snapshot
+from param_configuration.utils import merge_left, walk_directory
+
+REPOSITORY_ROOT = Path(__file__).parents[1]
+
+Setup = Callable[[Path, int], Callable[[], Any]]
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Registers the setup function of a benchmark."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def write(path: Path, text: str) -> Path:
+    """Writes the file, creating the parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def write_plain(directory: Path, scale: int) -> Path:
+    """Writes a large file without any tags."""
+    lines = []
+    for node in range(50 * scale):
+        lines.append(f"node_{node}:\n  ros__parameters:")
+        lines += [f"    param_{param}: {param * 0.5}" for param in range(20)]
+    return write(directory / "plain.yaml", "\n".join(lines) + "\n")
+
+
+@benchmark("load_plain")
+def load_plain(directory: Path, scale: int) -> Callable[[], Any]:
+    """A large file without any tags, the baseline for the parsing cost."""
+    file = write_plain(directory, scale)
+    return lambda: Configuration().load(file)
+
+
+@benchmark("read_snapshot")
+def read_plain_snapshot(directory: Path, scale: int) -> Callable[[], Any]:
+    """The same configuration as in load_plain, read from a binary snapshot."""
+    snapshot = directory / "plain.pcsnap"
+    write_snapshot(Configuration().load(write_plain(directory, scale)), snapshot)
+    return lambda: read_snapshot(snapshot)
+
+
+@benchmark("load_deep_overlay")
+def load_deep_overlay(directory: Path, scale: int) -> Callable[[], Any]:
+    """A file that is overlaid through a deep stack of layers, each overriding a part of the parameters."""
+    depth = 5 * scale
+    layers = []
+    for level in range(depth):
+        folder = f"layer_{level}"
+        layers.append(FileLocationLayer(layer_folder=folder, config_directory=directory))
+        header = "!overlay\n" if level < depth - 1 else ""
+        params = "\n".join(f"    param_{param}: {level}" for param in range(level, level + 50))
+        write(directory / folder / "params.yaml", f"{header}node:\n  ros__parameters:\n{params}\n")
+    return lambda: Configuration().load("config://params.yaml", config_layers=layers)
+
+
+def layer_stack(directory: Path, scale: int, depth: int) -> Callable[[], Any]:
+    """A large model file overlaid by a stack of layers, where every layer overrides a parameter of every node and
+    every third layer doesn't have the file at all."""
+    layers = [FileLocationLayer(layer_folder=f"layer_{level}", config_directory=directory) for level in range(depth)]
+    write(directory / f"layer_{depth - 1}" / "params.yaml", write_plain(directory, scale).read_text(encoding="utf-8"))
+    for level in range(depth - 1):
+        if level % 3 != 1:
+            nodes = "".join(f"node_{node}:\n  ros__parameters:\n    param_{level}: -1\n" for node in range(50 * scale))
+            write(directory / f"layer_{level}" / "params.yaml", f"!overlay\n{nodes}")
+    return lambda: Configuration().load("config://params.yaml", config_layers=layers)
+
+
+@benchmark("layer_stack_2")
+def layer_stack_2(directory: Path, scale: int) -> Callable[[], Any]:
+    """A device layer on top of a model layer."""
+    return layer_stack(directory, scale, 2)
+
+
+@benchmark("layer_stack_5")
+def layer_stack_5(directory: Path, scale: int) -> Callable[[], Any]:
+    """Five layers, for example device, hardware revision, customer, site and model."""
+    return layer_stack(directory, scale, 5)
+
+
+@benchmark("layer_stack_10")
+def layer_stack_10(directory: Path, scale: int) -> Callable[[], Any]:
+    """Ten layers."""
+    return layer_stack(directory, scale, 10)
+
+
+@benchmark("eval_many")
+def eval_many(directory: Path, scale: int) -> Callable[[], Any]:
+    """Thousands of !eval expressions that use variables, math and environment variables."""
+    lines = [".variables:", "  - base: 1.5", "  - offset: !eval var.base * 2"]
+    for index in range(500 * scale):
+        lines.append(f"value_{index}: !eval var.base * {index} + m.sqrt({index}) + var.offset")
+        if index % 10 == 0:
+            lines.append(f"home_{index}: !eval join(env.HOME, 'maps', '{index}')")
+    file = write(directory / "eval.yaml", "\n".join(lines) + "\n")
+    os.environ.setdefault("HOME", "/root")
+    return lambda: Configuration().load(file)
+
+
+@benchmark("from_fan_in")
+def from_fan_in(directory: Path, scale: int) -> Callable[[], Any]:
+    """Many !from tags reading values from a few shared files."""
+    shared_files = []
+    for index in range(10):
+        values = "\n".join(f"  key_{key}: {key}" for key in range(100))
+        shared_files.append(write(directory / f"shared_{index}.yaml", f"values:\n{values}\n"))
+
+    lines = [f"from_{index}: !from {shared_files[index % 10]} values.key_{index % 100}" for index in range(200 * scale)]
+    file = write(directory / "main.yaml", "\n".join(lines) + "\n")
+    return lambda: Configuration().load(file)
+
+
+@benchmark("get_resolved_yamls")
+def resolved_yamls(directory: Path, scale: int) -> Callable[[], Any]:
+    """A launch-like batch of files that include the same common files."""
+    common = write(directory / "common.yaml", "\n".join(f"common_{key}: {key}" for key in range(100)) + "\n")
+    files = []
+    for index in range(25 * scale):
+        text = f"node_{index}:\n  ros__parameters:\n    common: !include {common}\n    index: !eval {index} * 2\n"
+        files.append(str(write(directory / f"node_{index}.yaml", text)))
+
+    def run() -> Any:
+        paths = get_resolved_yamls(files)
+        for path in paths:
+            os.unlink(path)
+
+    return run
+
+
+@benchmark("load_from_archive")
+def load_from_archive(directory: Path, scale: int) -> Callable[[], Any]:
+    """A device bundle of many packages, resolved straight from a tar archive, as at boot."""
+    params = "".join(f"    param_{param}: {param * 0.5}\n" for param in range(20))
+    for package in range(50 * scale):
+        config = directory / "config"
+        write(config / "model" / f"package_{package}" / "params.yaml", f"node:\n  ros__parameters:\n{params}")
+        write(config / "device" / f"package_{package}" / "params.yaml", "!overlay\nnode:\n  a: 1\n")
+    with tarfile.open(directory / "bundle.tar", "w") as archive:
+        archive.add(directory / "config", arcname=".")
+
+    layers = [ArchiveLayer(directory / "bundle.tar", "device"), ArchiveLayer(directory / "bundle.tar", "model")]
+    files = [f"config://package_{package}/params.yaml" for package in range(50 * scale)]
+    return lambda: Configuration().load_many(files, config_layers=layers)
+
+
+@benchmark("render_fleet")
+def render_fleet(directory: Path, scale: int) -> Callable[[], Any]:
+    """Many devices that override a few parameters of the same large model file."""
+    lines = []
+    for node in range(20):
+        lines.append(f"node_{node}:\n  ros__parameters:\n    frame: !eval to_string('base_link')")
+        lines += [f"    param_{param}: {param * 0.5}" for param in range(20)]
+    write(directory / "config" / "model" / "params.yaml", "\n".join(lines) + "\n")
+    for device in range(20 * scale):
+        text = f"!overlay\nnode_{device % 20}:\n  ros__parameters:\n    param_0: {device}\n"
+        write(directory / "config" / "devices" / f"robot_{device}" / "params.yaml", text)
+
+    renderer = FleetRenderer(config_directory=directory / "config", output_directory=directory / "out")
+    devices = renderer.find_devices(["devices/*"])
+    return lambda: renderer.render(["config://params.yaml"], devices)
+
+
+@benchmark("merge_left")
+def merge_left_nested(_directory: Path, scale: int) -> Callable[[], Any]:
+    """Merging two wide and deep nested dictionaries."""
+
+    def nested(depth: int, value: int) -> dict:
+        if depth == 0:
+            return {f"leaf_{index}": value for index in range(10)}
+        return {f"key_{index}": nested(depth - 1, value) for index in range(4 * scale)}
+
+    return lambda: merge_left(nested(3, 1), nested(3, 2))
+
+
+@benchmark("walk_directory")
+def walk_large_directory(directory: Path, scale: int) -> Callable[[], Any]:
+    """A large config directory with many packages and parameter files."""
+    for package in range(20 * scale):
+        for index in range(10):
+            write(directory / "model" / f"package_{package}" / "params" / f"params_{index}.yaml", "param: 1\n")
+            write(directory / "model" / f"package_{package}" / f"readme_{index}.txt", "")
+    return lambda: walk_directory(directory / "model")
+
+
+@benchmark("import_package")
+def import_package(_directory: Path, _scale: int) -> Callable[[], Any]:
+    """Starting a new interpreter and importing the package, as every launch file does."""
+    command = [sys.executable, "-c", "import param_configuration.configuration"]
+    return lambda: subprocess.run(command, check=True, cwd=REPOSITORY_ROOT)
+
+
+@benchmark("cli_startup")
+def cli_startup(_directory: Path, _scale: int) -> Callable[[], Any]:
+    """Starting the config command line tool."""
+    command = [sys.executable, str(REPOSITORY_ROOT / "param_configuration" / "scripts" / "config"), "--help"]
+    # The script is run from its own directory, so the package is found only through the Python path
+    python_path = os.pathsep.join(path for path in [str(REPOSITORY_ROOT), os.environ.get("PYTHONPATH")] if path)
+    env = {**os.environ, "PYTHONPATH": python_path}
+    return lambda: subprocess.run(command, check=True, env=env, stdout=subprocess.DEVNULL)
@@ -0,0 +1,80 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Cached and lazily imported ament index functions.
+
+Importing the package or resolving a configuration without ROS package lookups doesn't import ament_index_python.
+"""
+import os
+import threading
+from typing import Optional
+
+# ament_index_python.packages.PackageNotFoundError is a subclass of KeyError, so the lookup errors can be caught without
+# importing ament_index_python. ValueError is raised for invalid package names.
+PACKAGE_LOOKUP_ERRORS = (KeyError, ValueError)
+
+
+class PackageIndex:
+    """Install prefixes of all the ROS packages, read from the ament resource index.
+
+    Looking up a package with ament_index_python probes the file system along all the AMENT_PREFIX_PATH prefixes on
+    every call. The index is instead read once, and read again only if AMENT_PREFIX_PATH changes or it is cleared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prefix_path: Optional[str] = None
+        self._prefixes: Optional[dict[str, str]] = None
+
+    def prefixes(self) -> dict[str, str]:
+        """Returns the install prefixes by package name. The returned dictionary must not be modified.
+
+        :raises EnvironmentError: If AMENT_PREFIX_PATH env variable is not set
+        """
+        prefix_path = os.environ.get("AMENT_PREFIX_PATH")
+        with self._lock:
+            if self._prefixes is None or self._prefix_path != prefix_path:
+                # pylint: disable=import-outside-toplevel
+                # ROS
+                from ament_index_python.packages import get_packages_with_prefixes
+
+                self._prefixes = get_packages_with_prefixes()
+                self._prefix_path = prefix_path
+            return self._prefixes
+
+    def clear(self) -> None:
+        """Reads the index again on the next lookup, for example after new packages have been built."""
+        with self._lock:
+            self._prefixes = None
+
+
+PACKAGE_INDEX = PackageIndex()
+
+
+def get_package_share_directory(package_name: str) -> str:
+    """Returns the share directory of the ROS package. Same as ament_index_python.packages.get_package_share_directory,
+    but uses the cached package index.
+
+    :raises PackageNotFoundError: If the package is not found
+    :raises EnvironmentError: If AMENT_PREFIX_PATH env variable is not set
+    """
+    prefix = PACKAGE_INDEX.prefixes().get(package_name)
+    if prefix is None:
+        # pylint: disable=import-outside-toplevel
+        # ROS
+        from ament_index_python.packages import PackageNotFoundError
+
+        raise PackageNotFoundError(f"package '{package_name}' not found, searching: {os.environ['AMENT_PREFIX_PATH']}")
+    return os.path.join(prefix, "share", package_name)
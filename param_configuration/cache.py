@@ -0,0 +1,180 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+# Parameter Configuration
+from param_configuration.ament_index import PACKAGE_LOOKUP_ERRORS, get_package_share_directory
+from param_configuration.config_layer import ConfigLayer
+from param_configuration.path_resolver import PathResolver
+from param_configuration.resolution import Dependencies, resolution_target
+from param_configuration.utils import ensure_private_directory
+
+# Increase when the format of the cache entries changes
+CACHE_VERSION = 1
+
+
+class ResolvedConfigCache:
+    """Persistent on-disk cache for resolved configurations.
+
+    Every entry stores the resolved data together with the content hashes of all the files, the config:// path
+    resolutions, the environment variables and the ROS package paths that the resolution depended on. An entry is
+    returned only if all of these are still unchanged, so the YAML files are not parsed at all on a cache hit.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self._directory = Path(directory)
+        self._verified = False
+
+    @classmethod
+    def from_env(cls) -> Optional["ResolvedConfigCache"]:
+        """Returns the cache pointed by PARAM_CACHE_DIR env variable, or None if caching is not enabled."""
+        directory = os.environ.get("PARAM_CACHE_DIR")
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Builds a cache key from the given JSON serializable parts."""
+        raw = json.dumps([CACHE_VERSION, *parts], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, config_layers: list[ConfigLayer]) -> Optional[Any]:
+        """Returns the cached value, or None if there is no valid entry for the key.
+
+        :param key: Key built with make_key
+        :param config_layers: Configuration layers used for the top-level resolution. Used to check that the
+            config:// paths still resolve into the same files.
+        :raises PermissionError: If the cache directory is not owned by the current user or others can write to it
+        """
+        self._verify_directory()
+        try:
+            with open(self._entry_path(key), "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, EOFError, pickle.PickleError):
+            return None
+
+        if not self._is_valid(entry["dependencies"], config_layers):
+            return None
+        return entry["value"]
+
+    def put(self, key: str, dependencies: Dependencies, value: Any) -> None:
+        """Stores the value and the content hashes of its dependencies to the cache.
+
+        :raises PermissionError: If the cache directory is not owned by the current user or others can write to it
+        """
+        manifest = {
+            "files": {path: file_digest(path) for path in sorted(dependencies.files)},
+            "resolutions": [(path, names, target) for (path, names), target in dependencies.resolutions.items()],
+            "env": dict(dependencies.env),
+            "packages": dict(dependencies.packages),
+        }
+
+        self._verify_directory()
+        # Write to a temporary file first so that concurrent readers never see a partially written entry
+        with tempfile.NamedTemporaryFile(mode="wb", dir=self._directory, delete=False) as file:
+            pickle.dump({"dependencies": manifest, "value": value}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file.name, self._entry_path(key))
+
+    def clear(self) -> None:
+        """Removes all the entries from the cache."""
+        if not self._directory.exists():
+            return
+        for entry in self._directory.glob("*.pickle"):
+            entry.unlink(missing_ok=True)
+
+    def _verify_directory(self) -> None:
+        """Creates the directory if needed, and checks that no other user can place entries into it.
+
+        The entries are unpickled, so an entry written by another user could run any code in this process.
+
+        :raises PermissionError: If the directory is not owned by the current user or others can write to it
+        """
+        if not self._verified:
+            ensure_private_directory(self._directory, "Cache directory")
+            self._verified = True
+
+    def _entry_path(self, key: str) -> Path:
+        return self._directory / f"{key}.pickle"
+
+    @staticmethod
+    def _is_valid(manifest: dict, config_layers: list[ConfigLayer]) -> bool:
+        """Checks that none of the recorded dependencies have changed."""
+        if not environment_unchanged(manifest["env"], manifest["packages"]):
+            return False
+
+        for path, digest in manifest["files"].items():
+            if file_digest(path) != digest:
+                return False
+
+        return resolutions_unchanged(manifest["resolutions"], config_layers)
+
+
+def environment_unchanged(env: dict[str, Optional[str]], packages: dict[str, Optional[str]]) -> bool:
+    """Checks that the environment variables and the ROS package paths still have the recorded values."""
+    for name, value in env.items():
+        if os.environ.get(name) != value:
+            return False
+
+    for package, share_directory in packages.items():
+        if package_share_directory(package) != share_directory:
+            return False
+    return True
+
+
+def resolutions_unchanged(
+    resolutions: Iterable[tuple[str, tuple[str, ...], str]], config_layers: list[ConfigLayer]
+) -> bool:
+    """Checks that the config:// paths still resolve into the same files.
+
+    Files might have been added to or removed from the upper layers after the paths were resolved.
+
+    :param resolutions: Recorded path, layer names and resolution target for each resolved path
+    :param config_layers: Configuration layers used for the top-level resolution. Explicitly given layers take
+        precedence over the default ones with the same name.
+    """
+    layers = {layer.name: layer for layer in PathResolver().get_layers()}
+    layers.update({layer.name: layer for layer in config_layers})
+    for path, layer_names, target in resolutions:
+        if any(name not in layers for name in layer_names):
+            return False
+        try:
+            resolved = PathResolver().resolve_path(path, config_layers=[layers[name] for name in layer_names])
+        except ValueError:
+            return False
+        if resolution_target(resolved) != target:
+            return False
+    return True
+
+
+def file_digest(path: Union[str, Path]) -> Optional[str]:
+    """Returns the SHA-256 of the file contents, or None if the file does not exist."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def package_share_directory(package: str) -> Optional[str]:
+    """Returns the share directory of the ROS package, or None if the package is not found."""
+    try:
+        return get_package_share_directory(package)
+    except PACKAGE_LOOKUP_ERRORS:
+        return None
@@ -13,9 +13,10 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
+import posixpath
 from abc import abstractmethod
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 
 class ConfigLayer:
@@ -26,10 +27,28 @@ class ConfigLayer:
         """Resolve path and return path or yaml string."""
 
     @abstractmethod
-    def get_files(self) -> Dict[str, Union[List[Path], str]]:
-        """Returns a list of files that match this layer."""
+    def get_files(
+        self, package: Optional[str] = None, max_depth: Optional[int] = None
+    ) -> Dict[str, Union[List[Path], str]]:
+        """Returns a list of files that match this layer.
+
+        :param package: If set, lists only the files of this package
+        :param max_depth: Number of folder levels to list, counting the package folders. If None, lists all of them.
+        """
 
     @property
     @abstractmethod
     def name(self) -> str:
         """Return the name of the layer."""
+
+
+def relative_config_path(path: Union[str, Path]) -> Optional[str]:
+    """Returns the config:// path relative to the layer root, with "/" as the separator.
+
+    :param path: Path in "config://" format
+    :return: The relative path, or None if it points outside the layer root
+    """
+    relative = posixpath.normpath(str(path).replace("config:", "", 1).lstrip("/"))
+    if relative.startswith("..") or relative == ".":
+        return None
+    return relative
@@ -0,0 +1,265 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import functools
+import mmap
+import os
+import posixpath
+import struct
+import tarfile
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+# Parameter Configuration
+from param_configuration.config_layer import ConfigLayer, relative_config_path
+from param_configuration.layer_index import files_tree
+
+# Suffixes of the archives that can be used as the config directory
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+# Fixed part of a zip local file header: the signature, and after the other fields, the file name and extra lengths
+_ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+
+def is_archive(path: Union[str, Path]) -> bool:
+    """Returns whether the path names a zip or tar archive, judging by its suffix."""
+    return str(path).endswith(ARCHIVE_SUFFIXES)
+
+
+class ArchiveLayer(ConfigLayer):
+    """Overlay configuration layer for a folder in a zip or tar archive, which is read without unpacking the archive.
+
+    Makes it possible to distribute the config directory of a device as a single bundle, for example
+    robot_1.tar with device and model folders in it.
+    """
+
+    def __init__(self, archive: Union[str, Path], layer_folder: str = "", name: Optional[str] = None):
+        """
+        :param archive: Path to a zip or tar archive, which may be compressed
+        :param layer_folder: Folder of the layer in the archive. By default, the root of the archive.
+        :param name: Name of the layer. Defaults to the layer folder, or to the archive file name for the root.
+        """
+        self._archive = os.path.abspath(archive)
+        self._prefix = posixpath.normpath(layer_folder).strip("/") + "/" if layer_folder.strip("/.") else ""
+        self._name = name or layer_folder or Path(archive).name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def load(self, path: Union[str, Path]) -> Union[str, Path, None]:
+        """Returns the contents of the file in the archive as a YAML string, or None if the archive doesn't have it."""
+        relative = relative_config_path(path)
+        if relative is None:
+            return None
+        contents = get_archive_index(self._archive).read(self._prefix + relative)
+        return contents.decode("utf-8") if contents is not None else None
+
+    def get_files(
+        self, package: Optional[str] = None, max_depth: Optional[int] = None
+    ) -> Dict[str, Union[List[Path], str]]:
+        """Return all possible files."""
+        return get_archive_index(self._archive).tree(self._prefix, package=package, max_depth=max_depth)
+
+
+class ArchiveIndex:
+    """Members of a zip or tar archive.
+
+    The members that are stored uncompressed are read straight from a memory map of the archive, and the deflated zip
+    members are decompressed from the memory map on every read. Compressed tar archives can't be read in random order,
+    so their YAML files are decompressed once when the archive is indexed. The archive is indexed again when it changes.
+    """
+
+    def __init__(self, archive: str):
+        """
+        :param archive: Path to the archive
+        """
+        self._archive = archive
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple[int, int, int]] = None
+        self._files: set[str] = set()
+        self._folders: set[str] = set()
+        self._readers: dict[str, Callable[[], bytes]] = {}
+        self._mmap: Optional[mmap.mmap] = None
+
+    def read(self, member: str) -> Optional[bytes]:
+        """Returns the contents of the member, or None if the archive doesn't have it.
+
+        :param member: Path of the member in the archive, with "/" as the separator
+        """
+        with self._lock:  # The archive is not indexed again in the middle of a read
+            self._refresh()
+            reader = self._readers.get(member)
+            return reader() if reader is not None else None
+
+    def tree(self, prefix: str = "", package: Optional[str] = None, max_depth: Optional[int] = None) -> Dict:
+        """Returns the YAML files under the prefix in the same format as utils.walk_directory.
+
+        :param prefix: Folder of the archive to list, ending with "/", or "" for the whole archive
+        :param package: If set, lists only the files of this package folder
+        :param max_depth: Number of folder levels to list, counting the package folders. If None, lists all of them.
+        """
+        with self._lock:
+            self._refresh()
+            files = {path[len(prefix) :] for path in self._files if path.startswith(prefix)}
+            folders = {path[len(prefix) :] for path in self._folders if path.startswith(prefix)}
+        return files_tree(files, folders, package=package, max_depth=max_depth)
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self._archive)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return
+
+        self._close()
+        self._files, self._folders, self._readers = set(), set(), {}
+        if signature is not None:  # A missing archive is a layer without any files
+            if zipfile.is_zipfile(self._archive):
+                self._index_zip()
+            else:
+                self._index_tar()
+        self._signature = signature
+
+    def _index_zip(self) -> None:
+        self._open_mmap()
+        with zipfile.ZipFile(self._archive) as archive:
+            members = archive.infolist()
+        for info in members:
+            name = _member_name(info.filename)
+            if name is None:
+                continue
+            if info.is_dir():
+                self._add_folder(name)
+                continue
+
+            self._add_file(name)
+            self._readers[name] = functools.partial(_read_zip_member, self._archive, info.filename)
+            if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or info.flag_bits & 0x1:
+                continue  # Other compression methods and encrypted members are read with zipfile
+            signature, name_length, extra_length = _ZIP_LOCAL_HEADER.unpack_from(self._mmap, info.header_offset)
+            if signature == _ZIP_LOCAL_SIGNATURE:
+                start = info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+                if info.compress_type == zipfile.ZIP_STORED:
+                    self._readers[name] = functools.partial(self._read_mapped, start, info.file_size)
+                else:
+                    self._readers[name] = functools.partial(self._read_deflated, start, info.compress_size)
+
+    def _index_tar(self) -> None:
+        try:
+            with tarfile.open(self._archive, "r:") as tar:
+                members = tar.getmembers()
+            compressed = False
+        except tarfile.ReadError:
+            compressed = True
+
+        if not compressed:
+            self._open_mmap()
+            for member in members:
+                name = self._add_tar_member(member)
+                if name is None:
+                    continue
+                if member.issparse():
+                    self._readers[name] = functools.partial(_read_tar_member, self._archive, member.name)
+                else:
+                    self._readers[name] = functools.partial(self._read_mapped, member.offset_data, member.size)
+            return
+
+        with tarfile.open(self._archive) as tar:
+            for member in tar:
+                name = self._add_tar_member(member)
+                if name is None:
+                    continue
+                if name.endswith((".yaml", ".yml")):
+                    contents = tar.extractfile(member).read()
+                    self._readers[name] = functools.partial(bytes, contents)
+                else:  # Other files are rarely read, so they are not kept in memory
+                    self._readers[name] = functools.partial(_read_tar_member, self._archive, member.name)
+
+    def _add_tar_member(self, member: tarfile.TarInfo) -> Optional[str]:
+        """Adds the file or folder of the member, and returns the name of the file, if the member is a file."""
+        name = _member_name(member.name)
+        if name is None:
+            return None
+        if member.isdir():
+            self._add_folder(name)
+            return None
+        if not member.isfile():  # Links and special files are not supported
+            return None
+        self._add_file(name)
+        return name
+
+    def _add_file(self, name: str) -> None:
+        self._files.add(name)
+        self._add_folder(posixpath.dirname(name))
+
+    def _add_folder(self, name: str) -> None:
+        # The archives don't always have entries for the folders, so they are added for the files as well
+        while name and name not in self._folders:
+            self._folders.add(name)
+            name = posixpath.dirname(name)
+
+    def _open_mmap(self) -> None:
+        with open(self._archive, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _read_mapped(self, start: int, size: int) -> bytes:
+        return self._mmap[start : start + size]
+
+    def _read_deflated(self, start: int, size: int) -> bytes:
+        return zlib.decompress(self._mmap[start : start + size], -zlib.MAX_WBITS)
+
+    def _close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def _member_name(name: str) -> Optional[str]:
+    """Returns the normalized path of an archive member, or None if it is the root or points outside the archive."""
+    normalized = posixpath.normpath(name.lstrip("/"))
+    if normalized == "." or normalized.startswith(".."):
+        return None
+    return normalized
+
+
+def _read_zip_member(archive: str, name: str) -> bytes:
+    with zipfile.ZipFile(archive) as zip_file:
+        return zip_file.read(name)
+
+
+def _read_tar_member(archive: str, name: str) -> bytes:
+    with tarfile.open(archive) as tar:
+        return tar.extractfile(name).read()
+
+
+_ARCHIVE_INDEXES: dict[str, ArchiveIndex] = {}
+_ARCHIVE_INDEXES_LOCK = threading.Lock()
+
+
+def get_archive_index(archive: str) -> ArchiveIndex:
+    """Returns the index of the archive, shared by all the layers of the process that read the same archive."""
+    key = os.path.abspath(archive)
+    with _ARCHIVE_INDEXES_LOCK:
+        index = _ARCHIVE_INDEXES.get(key)
+        if index is None:
+            index = _ARCHIVE_INDEXES[key] = ArchiveIndex(key)
+        return index
@@ -19,15 +19,34 @@ from typing import Dict, List, Optional, Union
 
 # Parameter Configuration
 from param_configuration.config_layer import ConfigLayer
+from param_configuration.layer_index import LayerIndex, get_layer_index
 from param_configuration.utils import walk_directory
 
 
 class FileLocationLayer(ConfigLayer):
     """Overlay configuration layer for a normal folder in config directory."""
 
-    def __init__(self, layer_folder: str, config_directory: Optional[str] = None):
+    def __init__(
+        self, layer_folder: str, config_directory: Optional[str] = None, index_interval: Optional[float] = None
+    ):
+        """
+        :param layer_folder: Folder of the layer in the config directory
+        :param config_directory: Config directory. If None, uses PARAM_CONFIG_DIR env variable
+        :param index_interval: If set, the files are looked up from an in-memory index of the layer folder instead of
+            the file system. The folder is checked for changes at most once per this many seconds.
+        """
         self._layer_folder = layer_folder
         self._config_directory = config_directory
+        self._index_interval = index_interval
+        self._index: Optional[LayerIndex] = None
+        self._index_directory: Optional[Path] = None
+
+    def __getstate__(self) -> dict:
+        # The index holds a lock and is shared by the layers of a process, so a pickled layer builds its own one
+        state = self.__dict__.copy()
+        state["_index"] = None
+        state["_index_directory"] = None
+        return state
 
     @property
     def name(self) -> str:
@@ -49,12 +68,37 @@ class FileLocationLayer(ConfigLayer):
 
     def load(self, path: Path) -> Union[str, Path, None]:
         """Try to load the file from the layer."""
-        directory = self.get_config_directory() / self._layer_folder
+        directory = Path(self.get_config_directory()) / self._layer_folder
+
+        exists = None
+        if self._index_interval is not None:
+            exists = self._get_index(directory).contains(str(path).replace("config:", ""))
+            if exists is False:
+                return None
+
         converted_path = Path(str(path).replace("config:", str(directory)))
-        if converted_path.exists():
+        if exists or converted_path.exists():
             return converted_path
         return None
 
-    def get_files(self) -> Dict[str, Union[List[Path], str]]:
+    def get_files(
+        self, package: Optional[str] = None, max_depth: Optional[int] = None
+    ) -> Dict[str, Union[List[Path], str]]:
         """Return all possible files."""
-        return walk_directory(directory=self.get_config_directory() / self._layer_folder)
+        directory = Path(self.get_config_directory()) / self._layer_folder
+        if self._index_interval is not None:
+            return self._get_index(directory).tree(package=package, max_depth=max_depth)
+        if package is None:
+            return walk_directory(directory=directory, max_depth=max_depth)
+
+        tree = {"__files": []}
+        if (max_depth is None or max_depth > 0) and (directory / package).is_dir():
+            tree[package] = walk_directory(directory / package, max_depth=None if max_depth is None else max_depth - 1)
+        return tree
+
+    def _get_index(self, directory: Path) -> LayerIndex:
+        # The config directory can change with PARAM_CONFIG_DIR env variable
+        if self._index is None or self._index_directory != directory:
+            self._index = get_layer_index(str(directory), self._index_interval)
+            self._index_directory = directory
+        return self._index
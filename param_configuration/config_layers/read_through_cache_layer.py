@@ -0,0 +1,156 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# Parameter Configuration
+from param_configuration.config_layer import ConfigLayer, relative_config_path
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+
+
+class ReadThroughCacheLayer(ConfigLayer):
+    """Keeps local copies of the files of a layer whose lookups are slow or unreliable, for example a layer that fetches
+    the files from a config server.
+
+    The lookups are answered from the local copies for as long as they are fresh. When a copy gets old, the wrapped
+    layer is asked again, and if it fails with an OSError, such as a connection error, the old copy is used instead.
+    The copies are kept in the cache directory, so they are used by the next processes as well.
+    """
+
+    def __init__(self, layer: ConfigLayer, cache_directory: Union[str, Path], max_age: Optional[float] = None):
+        """
+        :param layer: The wrapped layer
+        :param cache_directory: Directory for the local copies, created if needed
+        :param max_age: Seconds after which a file is looked up from the wrapped layer again. If None, the copies are
+            used until clear is called.
+        """
+        self._layer = layer
+        self._directory = Path(cache_directory)
+        self._max_age = max_age
+        # The copies fetched before this time are looked up again
+        self._cleared_at = float("-inf")
+        self._reset_fetch_state()
+
+    def __getstate__(self) -> dict:
+        # The lock can't be pickled, and a layer in another process reads the fetch times of the copies from the files
+        state = self.__dict__.copy()
+        for name in ("_lock", "_fetched", "_missing"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset_fetch_state()
+
+    @property
+    def name(self) -> str:
+        return self._layer.name
+
+    def load(self, path: Union[str, Path]) -> Union[str, Path, None]:
+        """Returns the local copy of the file, fetching it from the wrapped layer if needed.
+
+        :raises OSError: If the wrapped layer fails and there is no earlier copy of the file to fall back to
+        """
+        relative = relative_config_path(path)
+        if relative is None:
+            return self._layer.load(path)
+
+        copy = self._directory / relative
+        with self._lock:
+            missing_at = self._missing.get(relative)
+            fetched_at = self._fetched.get(relative)
+        if missing_at is not None and self._is_fresh(missing_at):
+            return None
+
+        try:
+            # The copies made by the earlier processes are as old as their modification time
+            fetched_at = fetched_at if fetched_at is not None else copy.stat().st_mtime
+            if self._is_fresh(fetched_at):
+                return copy
+        except FileNotFoundError:
+            fetched_at = None
+
+        now = time.time()
+        try:
+            data = self._layer.load(path)
+        except OSError:
+            if fetched_at is None:
+                raise
+            return copy  # Better an old copy than no configuration at all
+
+        if data is None:
+            with self._lock:
+                self._missing[relative] = now
+                self._fetched.pop(relative, None)
+            copy.unlink(missing_ok=True)
+            return None
+
+        self._write(copy, data.read_bytes() if isinstance(data, Path) else data.encode("utf-8"))
+        with self._lock:
+            self._fetched[relative] = now
+            self._missing.pop(relative, None)
+        return copy
+
+    def get_files(
+        self, package: Optional[str] = None, max_depth: Optional[int] = None
+    ) -> Dict[str, Union[List[Path], str]]:
+        """Returns the files of the wrapped layer, or the local copies if the wrapped layer fails with an OSError."""
+        filters = {"package": package, "max_depth": max_depth} if package is not None or max_depth is not None else {}
+        try:
+            return self._layer.get_files(**filters)
+        except OSError:
+            if not self._directory.is_dir():
+                return {"__files": []}
+            copies = FileLocationLayer(layer_folder=self._directory.name, config_directory=self._directory.parent)
+            return copies.get_files(package=package, max_depth=max_depth)
+
+    def clear(self) -> None:
+        """Looks up all the files from the wrapped layer again on the next lookup, keeping the copies as a fallback."""
+        with self._lock:
+            self._missing.clear()
+            self._cleared_at = time.time()
+
+    def _reset_fetch_state(self) -> None:
+        self._lock = threading.Lock()
+        # Times when the files were last looked up from the wrapped layer, and when the missing files were looked up
+        self._fetched: dict[str, float] = {}
+        self._missing: dict[str, float] = {}
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        if fetched_at <= self._cleared_at:
+            return False
+        return self._max_age is None or time.time() - fetched_at < self._max_age
+
+    @staticmethod
+    def _write(copy: Path, contents: bytes) -> None:
+        try:
+            if copy.read_bytes() == contents:
+                # The unchanged file is not rewritten, only marked as fetched for the later processes, which read
+                # the fetch time from the modification time. The files are fetched again at most once per max_age.
+                os.utime(copy)
+                return
+        except FileNotFoundError:
+            pass
+
+        copy.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partially written file
+        with tempfile.NamedTemporaryFile(dir=copy.parent, prefix=".", delete=False) as file:
+            file.write(contents)
+        os.replace(file.name, copy)
@@ -13,14 +13,12 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Union
-
-# ROS
-from ament_index_python.packages import PackageNotFoundError, get_package_share_directory
+from typing import Dict, List, Optional, Union
 
 # Parameter Configuration
+from param_configuration.ament_index import PACKAGE_INDEX, PACKAGE_LOOKUP_ERRORS, get_package_share_directory
 from param_configuration.config_layer import ConfigLayer
 from param_configuration.utils import walk_directory
 
@@ -39,20 +37,42 @@ class RosParamPackageLayer(ConfigLayer):
         try:
             converted_path = Path(get_package_share_directory(package)) / "params" / Path(config_file_path)
             return converted_path
-        except (PackageNotFoundError, ValueError):
+        except PACKAGE_LOOKUP_ERRORS:
             pass
         return None
 
-    def get_files(self) -> Dict[str, Union[List[Path], str]]:
-        packages = subprocess.check_output(["ros2", "pkg", "list"]).decode("utf-8").split("\n")
+    def get_files(
+        self, package: Optional[str] = None, max_depth: Optional[int] = None
+    ) -> Dict[str, Union[List[Path], str]]:
+        """Return the parameter files of all the ROS packages that have a params directory."""
         res = {"__files": []}
-        for package in packages:
-            try:
-                package_dir = Path(get_package_share_directory(package)) / "params"
-                if package_dir.exists():
-                    res[package] = walk_directory(directory=package_dir)
+        if max_depth is not None and max_depth <= 0:
+            return res
+
+        prefixes = PACKAGE_INDEX.prefixes()
+        if package is not None:
+            packages = [(package, prefixes[package])] if package in prefixes else []
+        else:
+            packages = sorted(prefixes.items())
 
-            except (PackageNotFoundError, ValueError):
-                pass
+        # Most of the packages don't have a params directory. The file system calls dominate on large workspaces, so
+        # check and walk the directories in parallel.
+        depth = None if max_depth is None else max_depth - 1
+        with ThreadPoolExecutor() as executor:
+            trees = executor.map(
+                walk_params_directory,
+                [Path(prefix) / "share" / name / "params" for name, prefix in packages],
+                [depth] * len(packages),
+            )
 
+        for (name, _), tree in zip(packages, trees):
+            if tree is not None:
+                res[name] = tree
         return res
+
+
+def walk_params_directory(directory: Path, max_depth: Optional[int] = None) -> Optional[Dict]:
+    """Returns the tree of the YAML files in the params directory, or None if the directory doesn't exist."""
+    if not directory.is_dir():
+        return None
+    return walk_directory(directory=directory, max_depth=max_depth)
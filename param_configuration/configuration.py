@@ -13,24 +13,40 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
-import pathlib
-import tempfile
+import copy
+import functools
 import io
-
+import os
+import pathlib
+import sys
+import threading
+import weakref
 from abc import abstractmethod
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Any, Optional, Type, Union
+from typing import Any, Callable, Optional, Type, Union
 
 # Thirdparty
-import numpy
 import ruamel.yaml
 from ruamel.yaml import BaseConstructor, Node, ScalarNode
 from ruamel.yaml.comments import CommentedMap
 from ruamel.yaml.constructor import Constructor
+from ruamel.yaml.representer import RoundTripRepresenter
 
 # Parameter Configuration
+from param_configuration.cache import ResolvedConfigCache
 from param_configuration.config_layer import ConfigLayer
+from param_configuration.loader_pool import ConfigLoaderPool
+from param_configuration.output_directory import ResolvedOutputDirectory
 from param_configuration.path_resolver import PathResolver
+from param_configuration.profiler import profile_span
+from param_configuration.resolution import (
+    CachedDocument,
+    DependencyGraph,
+    active_resolution,
+    current_dependencies,
+    resolution_scope,
+)
 
 
 class ConfigConstructor:
@@ -60,13 +76,20 @@ class ConfigConstructor:
 
     def __call__(self, loader: BaseConstructor, node: ScalarNode):
         tag_value = loader.construct_scalar(node)
+        return self.construct_value(tag_value=tag_value, file=node.end_mark.name, loader=loader)
 
-        # Support for nested tags
-        if "!" in tag_value:
-            raw = f"value: {tag_value}"
-            tag_value = Configuration().load(raw)["value"]
+    def construct_value(self, tag_value: str, file: str, loader: BaseConstructor) -> Any:
+        """Constructs the final value, first evaluating the nested tag if the value starts with one.
 
-        return self.constructor(tag_value=tag_value, file=node.end_mark.name, loader=loader)
+        For example, with !from '!eval path_to("pkg") + "/params/file.yaml key"' the nested !eval is evaluated
+        directly with the constructor that the loader has for the current file.
+        """
+        nested_tag, _, nested_value = tag_value.lstrip().partition(" ")
+        nested_const = getattr(loader, "config_constructors", {}).get(nested_tag)
+        if nested_tag.startswith("!") and isinstance(nested_const, ConfigConstructor):
+            tag_value = nested_const.construct_value(tag_value=nested_value.strip(), file=file, loader=loader)
+
+        return self.constructor(tag_value=tag_value, file=file, loader=loader)
 
 
 class ConfigMultiConstructor:
@@ -103,80 +126,337 @@ class Configuration:
 
     _constructors: dict[str, Type[ConfigConstructor]] = {}
     _multi_constructor: dict[str, Type[ConfigMultiConstructor]] = {}
+    _loader_pool = ConfigLoaderPool()
+    _registry_lock = threading.Lock()
 
     def load(self, file: Union[Path, str], config_layers: list[ConfigLayer] = None) -> Any:
         """Loads a given YAML file into a ruamel format dictionary.
 
+        If PARAM_CACHE_DIR env variable is set, the resolved configuration is cached there and returned without
+        parsing any YAML files for as long as none of the files, environment variables or ROS packages that it
+        depends on change.
+
         :param file: Yaml file in string format or path to YAML file
         :param config_layers: List of configuration layers that describe the order of overlaying different
             YAML files. If None, uses the default layers
-        :return: Loaded yaml file in Ruamel format. Mainly CommentedMap which corresponds dictionary.
+        :return: Loaded yaml file in Ruamel format. Mainly CommentedMap which corresponds dictionary, or a plain
+            dictionary for the files without tags.
         """
-        path = None
+        if config_layers is None:
+            config_layers = self.default_layers()
+
+        return self._cached_many([file], config_layers, lambda each: self._load(each, config_layers))[0]
+
+    async def aload(
+        self, file: Union[Path, str], config_layers: list[ConfigLayer] = None, executor: Optional[Executor] = None
+    ) -> Any:
+        """Loads a given YAML file like load, without blocking the running asyncio event loop.
 
-        if str(file).startswith("/"):  # Absolute YAML path was given
-            file = Path(file)
-        else:  # YAML string or "config://" was given
-            path = PathResolver().resolve_path(file, config_layers=config_layers)
+        The file is resolved in the executor, and at most PARAM_ASYNC_CONCURRENCY resolutions run at the same time per
+        event loop, by default as many as there are CPUs.
 
+        :param file: Yaml file in string format or path to YAML file
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :param executor: Executor to resolve the file in, for example a ProcessPoolExecutor to resolve many files in
+            parallel. If None, uses the default thread pool of the event loop.
+        :return: Loaded yaml file in Ruamel format
+        """
+        return await _run_limited(executor, _resolve_file, "load", file, config_layers=config_layers)
+
+    def load_with_dependencies(
+        self, file: Union[Path, str], config_layers: list[ConfigLayer] = None
+    ) -> tuple[Any, DependencyGraph]:
+        """Loads a given YAML file like load, and returns the dependency graph of the resolution as well.
+
+        The graph contains the files and config:// paths that were loaded, the tags that loaded them, and the
+        environment variables and ROS packages that were read. The persistent cache is not used, so that every file is
+        parsed and recorded in the graph.
+
+        :param file: Yaml file in string format or path to YAML file
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :return: Loaded yaml file in Ruamel format and the dependency graph
+        """
         if config_layers is None:
-            config_layers = PathResolver().get_layers()
+            config_layers = self.default_layers()
+
+        with resolution_scope() as resolution:
+            data = self._load(file, config_layers)
+        return data, resolution.dependencies.graph
 
-        yaml_loader = ruamel.yaml.YAML()
+    def load_to_string(
+        self, file: Union[Path, str], config_layers: list[ConfigLayer] = None, yaml_version: Optional[str] = None
+    ) -> str:
+        """Loads a given YAML file and dumps the resolved configuration into string format.
 
-        # In some cases, ruamel loads floats as ScalarFloat, which is ruamel-specific type. If this is passed
-        # to ROS Nodes, the Node doesn't read the parameter nor print any errors or warnings about it, and just
-        # uses the default values for it. To fix this issue, we register a float constructor as suggested in
-        # https://stackoverflow.com/questions/71552717/could-ruamel-yaml-support-type-descriptor-like-num-float-4
-        yaml_loader.constructor.add_constructor(
-            "tag:yaml.org,2002:float", ruamel.yaml.constructor.SafeConstructor.construct_yaml_float
+        Uses the same cache as load, so on a cache hit the YAML is neither parsed nor dumped.
+
+        :param file: Yaml file in string format or path to YAML file
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :param yaml_version: YAML version directive to add to the output, for example "1.1"
+        :return: Resolved configuration in YAML string format
+        """
+        if config_layers is None:
+            config_layers = self.default_layers()
+
+        return self.load_many_to_string([file], config_layers, yaml_version=yaml_version)[0]
+
+    def load_many(
+        self,
+        files: list[Union[Path, str]],
+        config_layers: list[ConfigLayer] = None,
+        executor: Optional[Executor] = None,
+    ) -> list[Any]:
+        """Loads multiple YAML files in a single resolution.
+
+        The files share the parsed documents, the evaluated variables and the layer lookups, so the files that are
+        included or overlaid by several of them are parsed only once. Much faster than calling load for each file.
+
+        :param files: Yaml files in string format or paths to YAML files
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :param executor: If given, the files are resolved independently of each other in parallel with the executor,
+            for example with a ProcessPoolExecutor. The files don't share the parsed documents then.
+        :return: Loaded yaml files in Ruamel format, in the same order as the given files
+        """
+        if config_layers is None:
+            config_layers = self.default_layers()
+
+        if executor is not None:
+            return _map_files(executor, "load", files, config_layers)
+        return self._cached_many(files, config_layers, lambda file: self._load(file, config_layers))
+
+    def load_many_to_string(
+        self,
+        files: list[Union[Path, str]],
+        config_layers: list[ConfigLayer] = None,
+        yaml_version: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ) -> list[str]:
+        """Loads multiple YAML files in a single resolution and dumps the resolved configurations into string format.
+
+        :param files: Yaml files in string format or paths to YAML files
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :param yaml_version: YAML version directive to add to the outputs, for example "1.1"
+        :param executor: If given, the files are resolved independently of each other in parallel with the executor
+        :return: Resolved configurations in YAML string format, in the same order as the given files
+        """
+        if config_layers is None:
+            config_layers = self.default_layers()
+
+        if executor is not None:
+            return _map_files(executor, "load_to_string", files, config_layers, yaml_version=yaml_version)
+        return self._cached_many(
+            files,
+            config_layers,
+            # Dumping doesn't modify the document, so the document shared with the resolution is dumped without a copy
+            lambda file: self.dump(self._load_document(file, config_layers), yaml_version=yaml_version),
+            variant=f"yaml-{yaml_version}",
         )
 
-        # numpy floats and ints couldn't be represented, so add the representers as suggested here:
-        # https://stackoverflow.com/questions/76430001
-        yaml_loader.Representer.add_representer(numpy.float64, represent_numpy_float64)
-        yaml_loader.Representer.add_representer(numpy.int64, represent_numpy_int64)
+    @staticmethod
+    def default_layers() -> list[ConfigLayer]:
+        """Returns the configuration layers that are used when no layers are given.
 
-        for const in self._constructors.values():
-            new_const = const()
-            new_const.config_layers = config_layers
-            new_const.file = file
-            yaml_loader.constructor.add_constructor(tag=new_const.tag, constructor=new_const)
+        These are the layers of the PathResolver, unless the running resolution overrides them, for example to resolve
+        the configurations of multiple devices in the same process.
+        """
+        resolution = active_resolution()
+        if resolution is not None and resolution.default_layers is not None:
+            resolution.default_layer_uses += 1
+            return resolution.default_layers
+        return PathResolver().get_layers()
+
+    def _cached_many(
+        self,
+        files: list[Union[Path, str]],
+        config_layers: list[ConfigLayer],
+        build: Callable[[Union[Path, str]], Any],
+        variant: str = "",
+    ) -> list[Any]:
+        """Runs the build function for each file within a single resolution, using the persistent cache for top-level
+        resolutions."""
+        cache = ResolvedConfigCache.from_env()
+        if cache is None or active_resolution() is not None:  # Nested loads are covered by the top-level entry
+            with resolution_scope():
+                return [build(file) for file in files]
+
+        layer_names = [layer.name for layer in config_layers]
+        tags = sorted(self._constructors) + sorted(self._multi_constructor)
+        keys = [cache.make_key(variant, str(file), layer_names, tags) for file in files]
+        values = [cache.get(key, config_layers=config_layers) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+
+        with resolution_scope() as resolution:
+            for index in missing:
+                values[index] = build(files[index])
+
+        # The dependencies of the files resolved together are not separated, so every entry depends on all of them.
+        # This only makes the entries to be invalidated more eagerly.
+        for index in missing:
+            cache.put(keys[index], resolution.dependencies, values[index])
+        return values
+
+    def load_shared(self, file: Union[Path, str], config_layers: list[ConfigLayer] = None, variant: str = "") -> Any:
+        """Loads a given YAML file, parsing each file at most once during the running resolution.
+
+        Unlike load, returns the document that is shared with all the other tags of the resolution, so the returned
+        data must not be modified. Meant for tags that only read a part of the document, such as !from.
 
-        for multi_const in self._multi_constructor.values():
-            new_const = multi_const()
-            new_const.config_layers = config_layers
-            new_const.file = file
-            yaml_loader.constructor.add_multi_constructor(tag_prefix=new_const.tag, multi_constructor=new_const)
+        :param file: Yaml file in string format or path to YAML file
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        :param variant: Caches the document separately under this name. For tags that construct the document
+            differently from a normal load, such as !overlay that reads only the overlay items of the layers below.
+        :return: Loaded yaml file in Ruamel format. Mainly CommentedMap which corresponds dictionary, or a plain
+            dictionary for the files without tags.
+        """
+        if config_layers is None:
+            config_layers = self.default_layers()
+
+        with resolution_scope():
+            return self._load_document(file, config_layers, variant)
+
+    def _load(self, file: Union[Path, str], config_layers: list[ConfigLayer]) -> Any:
+        """Loads a private copy of the document, parsing each file at most once during the running resolution."""
+        resolution = active_resolution()
+        resolution.load_count += 1
+
+        # The top-level document is not shared with any tag, so there is no need to keep a pristine copy of it
+        if resolution.load_count == 1 or self._document_key(file, config_layers) is None:
+            return self._parse(file, config_layers)
+        return copy.deepcopy(self._load_document(file, config_layers))
+
+    def _load_document(self, file: Union[Path, str], config_layers: list[ConfigLayer], variant: str = "") -> Any:
+        """Returns the document from the document cache of the running resolution, parsing it if needed."""
+        key = self._document_key(file, config_layers)
+        if key is None:  # YAML strings are not cached
+            return self._parse(file, config_layers)
+        if variant:
+            key += (variant,)
+
+        resolution = active_resolution()
+        default_names = None
+        if resolution.default_layers is not None:
+            default_names = tuple(layer.name for layer in resolution.default_layers)
+
+        # Documents whose nested loads used overridden default layers are reused only with the same default layers
+        cached = resolution.documents.get(key)
+        if cached is None or cached.default_layer_names not in (None, default_names):
+            default_layer_uses = resolution.default_layer_uses
+            with resolution.dependencies.track_files() as files:
+                document = self._parse(file, config_layers)
+            used_default_names = default_names if resolution.default_layer_uses != default_layer_uses else None
+            cached = resolution.documents[key] = CachedDocument(document, used_default_names, files)
+        else:
+            resolution.dependencies.add_files(cached.files)
+            resolution.dependencies.link(*self._document_node(file, config_layers))
+            if cached.default_layer_names is not None:
+                resolution.default_layer_uses += 1  # The documents that include this one depend on them as well
+        return cached.document
+
+    @staticmethod
+    def _document_key(file: Union[Path, str], config_layers: list[ConfigLayer]) -> Optional[tuple]:
+        """Returns the document cache key for file paths, or None for YAML strings."""
+        if not str(file).startswith(("/", "config:")):
+            return None
+        return str(file), tuple(layer.name for layer in config_layers)
+
+    def _parse(self, file: Union[Path, str], config_layers: list[ConfigLayer]) -> Any:
+        """Parses and resolves the YAML file with the given configuration layers."""
+        name, kind = self._document_node(file, config_layers)
+        with profile_span("file", name), current_dependencies().document(name, kind):
+            path = None
+
+            if str(file).startswith("/"):  # Absolute YAML path was given
+                file = Path(file)
+                current_dependencies().add_file(file)
+            else:  # YAML string or "config://" was given
+                path = PathResolver().resolve_path(file, config_layers=config_layers)
+
+            source = path if path is not None else file
+            contents = None if active_resolution().preserve_comments else self._tag_free_contents(source)
+            if contents is not None:
+                # The C-based safe loader is much faster, but drops the comments and produces plain dicts and lists
+                with self._loader_pool.safe_loader() as yaml_loader:
+                    resolved_yaml = yaml_loader.load(contents)
+            else:
+                resolved_yaml = self._construct(source, file, config_layers)
+
+            if isinstance(resolved_yaml, dict):  # Overlay items of the lower layers are merged by the layer above
+                resolved_yaml.pop(".variables", None)  # Remove the variables that are used for eval purposes
+            return resolved_yaml
+
+    def _construct(self, source: Union[Path, str], file: Union[Path, str], config_layers: list[ConfigLayer]) -> Any:
+        """Parses the YAML file or string with the round-trip loader that constructs the registered tags."""
+        # The registered tags are replaced and never modified, so this is a consistent snapshot of them
+        constructors, multi_constructors = self._constructors, self._multi_constructor
+        with self._loader_pool.loader(constructors, multi_constructors) as yaml_loader:
+            # Bind the file specific state to new constructor instances, the constructor table itself is shared
+            config_constructors = yaml_loader.constructor.config_constructors
+            for const in [*constructors.values(), *multi_constructors.values()]:
+                new_const = const()
+                new_const.config_layers = config_layers
+                new_const.file = file
+                config_constructors[new_const.tag] = new_const
+
+            return yaml_loader.load(source)
 
-        resolved_yaml = yaml_loader.load(path if path else file)
-        resolved_yaml.pop(".variables", None)  # Remove the variables that are used for eval purposes
-        return resolved_yaml
+    @staticmethod
+    def _tag_free_contents(source: Union[Path, str]) -> Optional[Union[bytes, str]]:
+        """Returns the contents of the YAML file or string if it doesn't contain any tags, otherwise None.
+
+        Every tag starts with "!", so a document without any "!" characters can't contain tags.
+        """
+        if isinstance(source, Path):
+            contents = source.read_bytes()
+            return contents if b"!" not in contents else None
+        return source if "!" not in source else None
+
+    @staticmethod
+    def _document_node(file: Union[Path, str], config_layers: list[ConfigLayer]) -> tuple[str, str]:
+        """Returns the name and the kind of the document for the profiler and the dependency graph."""
+        if str(file).startswith("/"):
+            return str(file), "file"
+        if str(file).startswith("config:"):
+            return f"{file} ({', '.join(layer.name for layer in config_layers)})", "config"
+        return "<yaml string>", "string"
 
     def add_config_constructor(self, const: Type[ConfigConstructor]):
         """Add a new config constructor to be used.
 
         :raises RuntimeError: If the tag already exists.
         """
-        if const.tag in self._constructors:
-            raise RuntimeError("Tag already registered")
-        self._constructors[const.tag] = const
+        with self._registry_lock:
+            if const.tag in self._constructors:
+                raise RuntimeError("Tag already registered")
+            # Copy on write, so that the loads running in other threads are not affected
+            Configuration._constructors = {**self._constructors, const.tag: const}
 
     def add_config_multi_constructor(self, multi_const: Type[ConfigMultiConstructor]):
         """Add a new config multi-constructor to be used.
 
         :raises RuntimeError: If the tag already exists.
         """
-        if multi_const.tag in self._multi_constructor:
-            raise RuntimeError("Tag already registered")
-        self._multi_constructor[multi_const.tag] = multi_const
+        with self._registry_lock:
+            if multi_const.tag in self._multi_constructor:
+                raise RuntimeError("Tag already registered")
+            Configuration._multi_constructor = {**self._multi_constructor, multi_const.tag: multi_const}
 
     @staticmethod
-    def dump(data: dict) -> str:
+    def dump(data: dict, yaml_version: Optional[str] = None) -> str:
         """Dump the YAML dictionary into string format."""
         yaml = ruamel.yaml.YAML(typ=["rt", "string"])
+        yaml.Representer = ConfigRepresenter.with_numpy_types()
+        if yaml_version:
+            yaml.version = yaml_version
 
-        with io.StringIO() as stream:
+        with profile_span("dump", "yaml"), io.StringIO() as stream:
             yaml.dump(data, stream)
             return stream.getvalue()
 
@@ -184,28 +464,116 @@ class Configuration:
     def dump_to_file(data: dict, path: str, yaml_version: Optional[str] = None) -> str:
         """Dump the YAML dictionary into a file."""
         yaml = ruamel.yaml.YAML(typ=["rt", "string"])
+        yaml.Representer = ConfigRepresenter.with_numpy_types()
         if yaml_version:
             yaml.version = yaml_version
         return yaml.dump(data, pathlib.Path(path))
 
     @staticmethod
-    def list_files() -> dict:
-        """Return the list of YAML files across all the layers."""
-        return PathResolver().get_files()
+    def list_files(package: Optional[str] = None, max_depth: Optional[int] = None) -> dict:
+        """Return the list of YAML files across all the layers.
+
+        :param package: If set, lists only the files of this package
+        :param max_depth: Number of folder levels to list per layer, counting the package folders
+        """
+        return PathResolver().get_files(package=package, max_depth=max_depth)
 
 
-def get_resolved_yaml(path: str):
-    """Evaluates YAML file and dumps it into a temporary file. When passing parameters for ROS Nodes, passing a file is
+def get_resolved_yaml(path: str, config_layers: Optional[list[ConfigLayer]] = None):
+    """Evaluates YAML file and dumps it into a file. When passing parameters for ROS Nodes, passing a file is
     desired, as that way we can maintain Node names that exist in the parameter file. Otherwise, passing two parameter
     dictionaries to a single Node might lead into a parameter name conflicts.
 
+    The file is written into the ResolvedOutputDirectory, where identical resolved configurations share the same file.
+
     :param path: path to YAML file
+    :param config_layers: Configuration layers to use, for example the layers of another device. If None, uses the
+        default layers
     :return: path to evaluated YAML file
     """
-    config = Configuration()
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as file:
-        config.dump_to_file(config.load(path), file.name, yaml_version="1.1")
-    return file.name
+    return _write_resolved_yaml(Configuration().load_to_string(path, config_layers, yaml_version="1.1"))
+
+
+async def aget_resolved_yaml(
+    path: str, config_layers: Optional[list[ConfigLayer]] = None, executor: Optional[Executor] = None
+) -> str:
+    """Evaluates YAML file and dumps it into a file like get_resolved_yaml, without blocking the running asyncio event
+    loop.
+
+    Both the resolution and the file I/O run in the executor, with the same concurrency limit as Configuration.aload.
+    For example, a service can render the configurations of many robots concurrently by gathering the calls with the
+    layers of each robot.
+
+    :param path: path to YAML file
+    :param config_layers: Configuration layers to use. If None, uses the default layers
+    :param executor: Executor to resolve the file in. If None, uses the default thread pool of the event loop.
+    :return: path to evaluated YAML file
+    """
+    return await _run_limited(executor, get_resolved_yaml, path, config_layers)
+
+
+def get_resolved_yamls(paths: list[str], workers: int = 1) -> list[str]:
+    """Evaluates multiple YAML files and dumps each of them into a file in the ResolvedOutputDirectory.
+
+    With a single worker, the files are resolved in a single resolution, and the files that are shared between the
+    configurations, such as includes and overlays, are parsed only once. With more workers, the files are resolved
+    independently of each other in parallel processes.
+
+    :param paths: paths to YAML files
+    :param workers: Number of processes to use for resolving the files
+    :return: paths to evaluated YAML files, in the same order as the given paths
+    """
+    if workers > 1 and len(paths) > 1:
+        # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor  # Slow to import, and not needed by most of the launches
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            yaml_strings = Configuration().load_many_to_string(paths, yaml_version="1.1", executor=executor)
+    else:
+        yaml_strings = Configuration().load_many_to_string(paths, yaml_version="1.1")
+    return [_write_resolved_yaml(yaml_string) for yaml_string in yaml_strings]
+
+
+def _map_files(executor: Executor, method: str, files: list, config_layers: list[ConfigLayer], **kwargs) -> list:
+    """Resolves each file with the given Configuration method in the executor."""
+    futures = [executor.submit(_resolve_file, method, file, config_layers=config_layers, **kwargs) for file in files]
+    return [future.result() for future in futures]
+
+
+def _resolve_file(method: str, file: Union[Path, str], **kwargs) -> Any:
+    """Resolves a single file in an executor worker. A module-level function, so that it can be sent to processes."""
+    return getattr(Configuration(), method)(file, **kwargs)
+
+
+# Semaphores that limit the number of concurrent resolutions, per event loop
+_ASYNC_LIMITS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _run_limited(executor: Optional[Executor], function: Callable, *args, **kwargs) -> Any:
+    """Runs the function in the executor once the concurrency limit of the running event loop allows it."""
+    # pylint: disable=import-outside-toplevel
+    import asyncio  # Slow to import, and not needed by the launch files
+
+    loop = asyncio.get_running_loop()
+    limit = _ASYNC_LIMITS.get(loop)
+    if limit is None:
+        concurrency = int(os.environ.get("PARAM_ASYNC_CONCURRENCY") or os.cpu_count() or 1)
+        limit = _ASYNC_LIMITS[loop] = asyncio.Semaphore(concurrency)
+    async with limit:
+        # A partial of a module-level function can be sent to processes as well
+        return await loop.run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+
+def _write_resolved_yaml(yaml_string: str) -> str:
+    """Writes the resolved YAML into the output directory and returns the path to it."""
+    with profile_span("output", "output directory"):
+        path = str(ResolvedOutputDirectory.from_env().write(yaml_string))
+
+    # The path ends up in the resolved data when called from !eval, so the file must exist for cache hits to be valid
+    dependencies = current_dependencies()
+    if dependencies is not None:
+        dependencies.add_file(path)
+    return path
 
 
 def represent_numpy_float64(self, value):
@@ -216,3 +584,25 @@ def represent_numpy_float64(self, value):
 def represent_numpy_int64(self, value):
     """Represents numpy int64 format as normal Python int."""
     return self.represent_int(value)
+
+
+class ConfigRepresenter(RoundTripRepresenter):
+    """Round-trip representer used for dumping the resolved configurations."""
+
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def with_numpy_types(cls) -> type["ConfigRepresenter"]:
+        """Returns the representer class, with the representers for numpy types if numpy has been imported.
+
+        numpy is slow to import, so it is not imported here. The data can't contain numpy values unless numpy has been
+        imported already, for example by an !eval using np.
+        """
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and numpy.int64 not in cls.yaml_representers:
+            with cls._registry_lock:
+                # numpy floats and ints couldn't be represented, so add the representers as suggested here:
+                # https://stackoverflow.com/questions/76430001
+                cls.add_representer(numpy.float64, represent_numpy_float64)
+                cls.add_representer(numpy.int64, represent_numpy_int64)
+        return cls
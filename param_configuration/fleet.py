@@ -0,0 +1,122 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Union
+
+# Parameter Configuration
+from param_configuration.config_layer import ConfigLayer
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.config_layers.ros_package import RosParamPackageLayer
+from param_configuration.configuration import Configuration
+from param_configuration.path_resolver import layer_folders
+from param_configuration.resolution import resolution_scope
+from param_configuration.snapshot import SNAPSHOT_SUFFIX, write_snapshot
+
+
+class FleetRenderer:
+    """Resolves the configurations of many devices that share the same config directory.
+
+    Only the device layer differs between the devices, so the devices are resolved in a single resolution where the
+    files of the model and ROS package layers are parsed only once.
+    """
+
+    def __init__(self, config_directory: Union[str, Path], output_directory: Union[str, Path]):
+        self._config_directory = Path(config_directory)
+        self._output_directory = Path(output_directory)
+
+    def find_devices(self, patterns: list[str]) -> list[str]:
+        """Returns the device folders in the config directory that match any of the given glob patterns.
+
+        :param patterns: Glob patterns relative to the config directory, for example "devices/*"
+        :return: Device folders relative to the config directory
+        """
+        shared_folders = layer_folders()[1:]
+        devices = set()
+        for pattern in patterns:
+            for path in self._config_directory.glob(pattern):
+                if path.is_dir() and path.name not in shared_folders and not path.name.startswith("."):
+                    devices.add(str(path.relative_to(self._config_directory)))
+        return sorted(devices)
+
+    def device_layers(self, device: str) -> list[ConfigLayer]:
+        """Returns the configuration layers of the device, in the same order as the default layers.
+
+        The device folder replaces the topmost of the default layer folders, see path_resolver.layer_folders.
+        """
+        return [
+            FileLocationLayer(layer_folder=folder, config_directory=self._config_directory)
+            for folder in [device, *layer_folders()[1:]]
+        ] + [RosParamPackageLayer()]
+
+    def render(
+        self, config_files: list[str], devices: list[str], workers: int = 1, snapshot: bool = False
+    ) -> list[Path]:
+        """Resolves the configuration files for each device and writes them into the output directory.
+
+        The files are written to <output directory>/<device>/<config file>, for example config://pkg/params.yaml of
+        device "robot_1" is written to <output directory>/robot_1/pkg/params.yaml.
+
+        :param config_files: Configuration files to resolve in "config://" format
+        :param devices: Device folders relative to the config directory
+        :param workers: Number of processes to divide the devices between
+        :param snapshot: Write binary snapshots instead of YAML files, for example robot_1/pkg/params.pcsnap. See
+            param_configuration.snapshot.
+        :return: Paths to the written files
+        :raises ValueError: If a configuration file is not in "config://" format or can't be resolved
+        """
+        for config_file in config_files:
+            if not config_file.startswith("config://"):
+                raise ValueError(f"Fleet rendering supports only config:// paths, got {config_file}")
+
+        workers = min(workers, len(devices))
+        if workers <= 1:
+            return self._render_devices(config_files, devices, snapshot)
+
+        # Each process resolves a share of the devices in a single resolution
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._render_devices, config_files, devices[index::workers], snapshot)
+                for index in range(workers)
+            ]
+            return [path for future in futures for path in future.result()]
+
+    def _render_devices(self, config_files: list[str], devices: list[str], snapshot: bool) -> list[Path]:
+        written = []
+        with resolution_scope() as resolution:
+            original_default_layers = resolution.default_layers
+            try:
+                for device in devices:
+                    layers = self.device_layers(device)
+                    # The includes of the files must use the layers of the device instead of the default ones
+                    resolution.default_layers = layers
+                    if snapshot:
+                        outputs = Configuration().load_many(config_files, layers)
+                    else:
+                        outputs = Configuration().load_many_to_string(config_files, layers, yaml_version="1.1")
+
+                    for config_file, output in zip(config_files, outputs):
+                        output_file = self._output_directory / device / config_file.replace("config://", "", 1)
+                        output_file.parent.mkdir(parents=True, exist_ok=True)
+                        if snapshot:
+                            output_file = output_file.with_suffix(SNAPSHOT_SUFFIX)
+                            write_snapshot(output, output_file)
+                        else:
+                            output_file.write_text(output, encoding="utf-8")
+                        written.append(output_file)
+            finally:
+                resolution.default_layers = original_default_layers
+        return written
@@ -0,0 +1,186 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""In-memory indexes of the files in the layer folders.
+
+Resolving a config:// path probes the file system once per layer. On slow file systems, such as NFS mounted config
+directories, these probes add up. A layer index reads the folder with a single directory scan, and answers the
+lookups from memory for as long as the folder is unchanged.
+"""
+import os
+import posixpath
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LayerIndex:
+    """Files and folders under a layer folder.
+
+    Adding or removing a file changes the modification time of its folder. The modification times of all the folders
+    are checked at most once per refresh interval, and the folder is scanned again if any of them has changed.
+    """
+
+    def __init__(self, directory: str, refresh_interval: float = 0.0):
+        """
+        :param directory: Layer folder
+        :param refresh_interval: Minimum number of seconds between checking the folders for changes. With 0, the
+            folders are checked on every lookup.
+        """
+        self._directory = directory
+        self._refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._files: Optional[set[str]] = None
+        self._folders: set[str] = set()
+        self._folder_mtimes: dict[str, Optional[int]] = {}
+        self._checked_at = 0.0
+
+    def contains(self, relative_path: str) -> Optional[bool]:
+        """Returns whether the file exists in the layer folder.
+
+        :param relative_path: Path relative to the layer folder, with "/" as the separator
+        :return: Whether the file exists, or None if the path can't be answered from the index, for example because it
+            points outside the layer folder
+        """
+        files = self._current()[0]
+        relative_path = relative_path.lstrip("/")
+        if relative_path in files:
+            return True
+
+        normalized = posixpath.normpath(relative_path)
+        if normalized.startswith(".."):
+            return None
+        return normalized in files
+
+    def tree(self, package: Optional[str] = None, max_depth: Optional[int] = None) -> Dict:
+        """Returns the YAML files in the same format as utils.walk_directory.
+
+        :param package: If set, lists only the files of this package folder
+        :param max_depth: Number of folder levels to list, counting the package folders. If None, lists all of them.
+        """
+        files, folders = self._current()
+        return files_tree(files, folders, package=package, max_depth=max_depth)
+
+    def clear(self) -> None:
+        """Scans the folder again on the next lookup."""
+        with self._lock:
+            self._files = None
+
+    def _current(self) -> tuple[set[str], set[str]]:
+        with self._lock:
+            now = time.monotonic()
+            if self._files is None or (now - self._checked_at >= self._refresh_interval and self._changed()):
+                self._scan()
+            if now - self._checked_at >= self._refresh_interval:
+                self._checked_at = now
+            return self._files, self._folders
+
+    def _changed(self) -> bool:
+        return any(_mtime(folder) != mtime for folder, mtime in self._folder_mtimes.items())
+
+    def _scan(self) -> None:
+        files: set[str] = set()
+        folders: set[str] = set()
+        folder_mtimes = {self._directory: _mtime(self._directory)}
+
+        stack = [("", self._directory, frozenset())]
+        while stack:
+            relative, folder, ancestors = stack.pop()
+            try:
+                stat = os.stat(folder)
+                if (stat.st_dev, stat.st_ino) in ancestors:  # Symbolic links may form cycles
+                    continue
+                ancestors = ancestors | {(stat.st_dev, stat.st_ino)}
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        entry_relative = posixpath.join(relative, entry.name)
+                        if entry.is_dir():
+                            folders.add(entry_relative)
+                            folder_mtimes[entry.path] = _mtime(entry.path)
+                            stack.append((entry_relative, entry.path, ancestors))
+                        elif entry.is_file():
+                            files.add(entry_relative)
+            except OSError:
+                continue  # The folder doesn't exist, or was removed during the scan
+
+        self._files, self._folders, self._folder_mtimes = files, folders, folder_mtimes
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def files_tree(
+    files: set[str], folders: set[str], package: Optional[str] = None, max_depth: Optional[int] = None
+) -> Dict:
+    """Builds the tree of the YAML files in the same format as utils.walk_directory.
+
+    :param files: Relative paths of the files, with "/" as the separator
+    :param folders: Relative paths of the folders
+    :param package: If set, lists only the files of this package folder
+    :param max_depth: Number of folder levels to list, counting the package folders. If None, lists all of them.
+    """
+    children: dict[str, list[str]] = {}
+    for path in folders | files:
+        children.setdefault(posixpath.dirname(path), []).append(path)
+    if package is None:
+        return _build_tree("", children, files, max_depth)
+
+    tree: Dict = {"__files": []}
+    if (max_depth is None or max_depth > 0) and package in folders:
+        tree[package] = _build_tree(package, children, files, None if max_depth is None else max_depth - 1)
+    return tree
+
+
+def _build_tree(relative: str, children: dict[str, list[str]], files: set[str], max_depth: Optional[int]) -> Dict:
+    """Builds the tree of the folder like utils.walk_directory, skipping hidden files and folders."""
+    tree: Dict = {"__files": []}
+    # Folders first, then by name
+    paths = sorted(children.get(relative, []), key=lambda child: (child in files, posixpath.basename(child).lower()))
+    for path in paths:
+        name = posixpath.basename(path)
+        if name.startswith(".") or name.startswith("__"):
+            continue
+        if path in files:
+            if name.endswith(".yaml") or name.endswith(".yml"):
+                tree["__files"].append(name)
+            continue
+        if max_depth is None or max_depth > 0:
+            tree[name] = _build_tree(path, children, files, None if max_depth is None else max_depth - 1)
+    return tree
+
+
+_INDEXES: dict[tuple[str, float], LayerIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_layer_index(directory: str, refresh_interval: float) -> LayerIndex:
+    """Returns the index of the layer folder, shared by all the layers of the process that use the same folder."""
+    key = (os.path.abspath(directory), refresh_interval)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = LayerIndex(key[0], refresh_interval)
+        return index
+
+
+def clear_layer_indexes() -> None:
+    """Scans all the layer folders again on the next lookup, for example after the config directory was updated."""
+    with _INDEXES_LOCK:
+        for index in _INDEXES.values():
+            index.clear()
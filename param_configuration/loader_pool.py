@@ -0,0 +1,142 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+# Thirdparty
+import ruamel.yaml
+from ruamel.yaml import Node
+from ruamel.yaml.constructor import RoundTripConstructor, SafeConstructor
+
+# Parameter Configuration
+from param_configuration.profiler import profile_span
+from param_configuration.resolution import tag_scope
+
+
+class ConfigRoundTripConstructor(RoundTripConstructor):
+    """Round-trip constructor that dispatches the configuration tags to the constructors bound for the loaded file."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config_constructors: dict[str, Callable] = {}
+        self.config_root: Optional[Node] = None
+
+    def construct_document(self, node: Node) -> Any:
+        # Tags such as !eval need to access the whole document, for example to find the ".variables"
+        self.config_root = node
+        try:
+            return super().construct_document(node)
+        finally:
+            self.config_root = None
+
+
+def _construct_config_tag(tag: str, constructor: ConfigRoundTripConstructor, node: Node) -> Any:
+    with profile_span("tag", tag), tag_scope(tag):
+        return constructor.config_constructors[tag](constructor, node)
+
+
+def _construct_config_multi_tag(
+    tag_prefix: str, constructor: ConfigRoundTripConstructor, tag_suffix: str, node: Node
+) -> Any:
+    with profile_span("tag", tag_prefix), tag_scope(tag_prefix):
+        return constructor.config_constructors[tag_prefix](constructor, tag_suffix, node)
+
+
+class ConfigLoaderPool:
+    """Pool of reusable ruamel YAML loaders.
+
+    The constructor tables are built only once per set of registered tags and the idle loaders are reused, so that the
+    nested loads of the tags don't need to set up a new loader every time. Only the per-file constructors are bound to
+    a loader when it is taken into use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._constructor_classes: dict[tuple, type[ConfigRoundTripConstructor]] = {}
+        self._idle_loaders: dict[tuple, list[ruamel.yaml.YAML]] = {}
+        self._idle_safe_loaders: list[ruamel.yaml.YAML] = []
+
+    @contextmanager
+    def loader(self, constructors: dict[str, type], multi_constructors: dict[str, type]) -> Iterator[ruamel.yaml.YAML]:
+        """Takes a loader for the given registered tags into use for a single load.
+
+        :param constructors: Registered constructor classes by tag
+        :param multi_constructors: Registered multi-constructor classes by tag prefix
+        :return: YAML loader whose constructor has the config_constructors attribute for binding the tag constructors
+        """
+        key = (tuple(constructors.items()), tuple(multi_constructors.items()))
+        with self._lock:
+            idle_loaders = self._idle_loaders.setdefault(key, [])
+            yaml_loader = idle_loaders.pop() if idle_loaders else None
+            if yaml_loader is None:
+                constructor_class = self._constructor_classes.get(key)
+                if constructor_class is None:
+                    constructor_class = self._build_constructor_class(constructors, multi_constructors)
+                    self._constructor_classes[key] = constructor_class
+
+        if yaml_loader is None:
+            yaml_loader = ruamel.yaml.YAML()
+            yaml_loader.Constructor = constructor_class
+
+        yield yaml_loader
+
+        # Loaders that failed are not reused, as their constructor might have been left in an inconsistent state
+        yaml_loader.constructor.config_constructors = {}
+        yaml_loader.doc_infos.clear()
+        with self._lock:
+            idle_loaders.append(yaml_loader)
+
+    @contextmanager
+    def safe_loader(self) -> Iterator[ruamel.yaml.YAML]:
+        """Takes a safe loader into use for a single load of a document without tags.
+
+        The safe loader uses the C-based parser of ruamel when it is available, and constructs plain Python types.
+        """
+        with self._lock:
+            yaml_loader = self._idle_safe_loaders.pop() if self._idle_safe_loaders else None
+        if yaml_loader is None:
+            yaml_loader = ruamel.yaml.YAML(typ="safe")
+
+        yield yaml_loader
+
+        with self._lock:
+            self._idle_safe_loaders.append(yaml_loader)
+
+    @staticmethod
+    def _build_constructor_class(
+        constructors: dict[str, type], multi_constructors: dict[str, type]
+    ) -> type[ConfigRoundTripConstructor]:
+        """Creates a constructor class with the constructor table for the given tags.
+
+        A new class is needed, as ruamel stores the constructor tables in the class.
+        """
+        constructor_class = type("ConfigRoundTripConstructor", (ConfigRoundTripConstructor,), {})
+
+        # In some cases, ruamel loads floats as ScalarFloat, which is ruamel-specific type. If this is passed
+        # to ROS Nodes, the Node doesn't read the parameter nor print any errors or warnings about it, and just
+        # uses the default values for it. To fix this issue, we register a float constructor as suggested in
+        # https://stackoverflow.com/questions/71552717/could-ruamel-yaml-support-type-descriptor-like-num-float-4
+        constructor_class.add_constructor("tag:yaml.org,2002:float", SafeConstructor.construct_yaml_float)
+
+        for tag in constructors:
+            constructor_class.add_constructor(tag, functools.partial(_construct_config_tag, tag))
+        for tag_prefix in multi_constructors:
+            constructor_class.add_multi_constructor(
+                tag_prefix, functools.partial(_construct_config_multi_tag, tag_prefix)
+            )
+        return constructor_class
@@ -0,0 +1,145 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import hashlib
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+# Parameter Configuration
+from param_configuration.utils import ensure_private_directory
+
+# Resolved files that have not been used for a day are removed
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Names of the files written by ResolvedOutputDirectory.write, other files in the directory are never removed
+_RESOLVED_FILE_NAME = re.compile(r"[0-9a-f]{32}\.\w+")
+
+
+class ResolvedOutputDirectory:
+    """Directory for the resolved YAML files that are passed to the ROS nodes.
+
+    The files are named after the hash of their contents, so resolving the same configuration again reuses the
+    existing file instead of writing a new one. The modification time of a file is updated whenever it is reused, and
+    the files that have not been used for the longest time are removed once they are older than the maximum age or the
+    directory grows larger than the maximum size.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], max_age: float = DEFAULT_MAX_AGE, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        :param directory: Directory for the resolved files, created if needed
+        :param max_age: Seconds since the last use after which a file is removed
+        :param max_bytes: Maximum total size of the files in the directory
+        """
+        self.directory = Path(directory)
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._verified = False
+
+    @classmethod
+    def from_env(cls) -> "ResolvedOutputDirectory":
+        """Returns the output directory configured with the environment variables.
+
+        PARAM_OUTPUT_DIR sets the directory. By default, the files are written into the user specific runtime
+        directory set with XDG_RUNTIME_DIR, or into a folder named after the user id in the temporary directory.
+        PARAM_OUTPUT_MAX_AGE sets the maximum age in seconds and PARAM_OUTPUT_MAX_BYTES the maximum total size.
+        """
+        directory = os.environ.get("PARAM_OUTPUT_DIR")
+        if not directory:
+            runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+            if runtime_directory:
+                directory = Path(runtime_directory) / "param_configuration"
+            else:
+                # The user id is used instead of the user name, which is not available in all containers
+                directory = Path(tempfile.gettempdir()) / f"param_configuration_{os.getuid()}"
+        return cls(
+            directory,
+            max_age=float(os.environ.get("PARAM_OUTPUT_MAX_AGE", DEFAULT_MAX_AGE)),
+            max_bytes=int(os.environ.get("PARAM_OUTPUT_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+
+    def write(self, contents: str, suffix: str = ".yaml") -> Path:
+        """Writes the contents into a file named after their hash, unless the file exists already.
+
+        :param contents: Contents of the file
+        :param suffix: File name suffix
+        :return: Path to the file
+        """
+        self._verify_directory()
+        path = self.directory / (hashlib.sha256(contents.encode("utf-8")).hexdigest()[:32] + suffix)
+        try:
+            os.utime(path)  # Marks the file as recently used, so that it is not evicted
+            return path
+        except FileNotFoundError:
+            pass
+
+        # Write to a temporary file first so that concurrent readers never see a partially written file
+        with tempfile.NamedTemporaryFile(mode="w", dir=self.directory, prefix=".", delete=False) as file:
+            file.write(contents)
+        os.replace(file.name, path)
+
+        self.evict(keep=path)
+        return path
+
+    def _verify_directory(self) -> None:
+        """Creates the directory if needed, and checks that no other user can place files into it.
+
+        The existing files are trusted to contain the configuration their name is the hash of, so a directory that
+        another user could write to, for example one created in advance in the shared temporary directory, is refused.
+
+        :raises PermissionError: If the directory is not owned by the current user or others can write to it
+        """
+        if self._verified:
+            return
+        ensure_private_directory(self.directory, "Output directory")
+        self._verified = True
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Removes the files that are too old, and the least recently used files while the directory is too large.
+
+        Only the resolved files are considered, so any other files in the directory and the temporary files that are
+        still being written are left untouched.
+
+        :param keep: File that is never removed, for example the one that was just written
+        """
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [
+                    (entry.stat(), entry.path)
+                    for entry in entries
+                    if _RESOLVED_FILE_NAME.fullmatch(entry.name) and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return
+
+        files.sort(key=lambda file: file[0].st_mtime)
+        total_bytes = sum(status.st_size for status, _ in files)
+        oldest_allowed = time.time() - self._max_age
+        for status, path in files:
+            if status.st_mtime >= oldest_allowed and total_bytes <= self._max_bytes:
+                break
+            if keep is not None and path == str(keep):
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # Removed by another process
+            total_bytes -= status.st_size
@@ -14,13 +14,29 @@
 #   limitations under the License.
 #  ------------------------------------------------------------------
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional, Union
 
 # Parameter Configuration
 from param_configuration.config_layer import ConfigLayer
+from param_configuration.config_layers.archive_layer import ArchiveLayer, is_archive
 from param_configuration.config_layers.file_location_layer import FileLocationLayer
 from param_configuration.config_layers.ros_package import RosParamPackageLayer
+from param_configuration.profiler import profile_span
+from param_configuration.resolution import active_resolution
+
+
+def layer_folders() -> list[str]:
+    """Returns the folders of the default file layers in the config directory, from the highest priority to the lowest.
+
+    These are the device and the model folders, unless PARAM_LAYERS sets a comma-separated list of folders, for example
+    "device,hardware_revision,customer,site,model".
+    """
+    folders = os.getenv("PARAM_LAYERS")
+    if folders:
+        return [folder.strip() for folder in folders.split(",") if folder.strip()]
+    return [os.getenv("PARAM_DEVICE_DIR", "device"), "model"]
 
 
 class PathResolver:
@@ -30,9 +46,15 @@ class PathResolver:
         self._layers: list[ConfigLayer] = []
 
         # Add the default config layers, order matters!
-        if os.getenv("PARAM_CONFIG_DIR"):  # Add model and device layers only if ENV variable exists
-            self.add_layer(layer=FileLocationLayer(layer_folder=os.getenv("PARAM_DEVICE_DIR", "device")))
-            self.add_layer(layer=FileLocationLayer(layer_folder="model"))
+        config_directory = os.getenv("PARAM_CONFIG_DIR")
+        if config_directory and is_archive(config_directory):  # A bundle of the config directory is read as is
+            for layer_folder in layer_folders():
+                self.add_layer(layer=ArchiveLayer(archive=config_directory, layer_folder=layer_folder))
+        elif config_directory:  # Add the file layers only if ENV variable exists
+            interval = os.getenv("PARAM_LAYER_INDEX_INTERVAL")
+            index_interval = float(interval) if interval else None
+            for layer_folder in layer_folders():
+                self.add_layer(layer=FileLocationLayer(layer_folder=layer_folder, index_interval=index_interval))
         self.add_layer(layer=RosParamPackageLayer())
 
     def resolve_path(
@@ -51,13 +73,36 @@ class PathResolver:
 
         if not path.startswith("config:"):
             return path
+        return self.resolve_layer(path, config_layers)[1]
 
+    def resolve_layer(
+        self, path: str, config_layers: Optional[list[ConfigLayer]] = None
+    ) -> tuple[int, Union[str, Path]]:
+        """Resolves the config:// path like resolve_path, and returns the index of the layer that had it as well.
+
+        :param path: Path in "config://" format
+        :param config_layers: List of configuration layers to go through. If None, uses the default layers
+        :return: Index of the first layer in config_layers that has the path, and the file or the YAML string from it
+        :raises ValueError: If the path cannot be resolved
+        """
         layers = self._layers if config_layers is None else config_layers
+        layer_names = tuple(each.name for each in layers)
+
+        # The layer lookups are done only once per path during a resolution
+        resolution = active_resolution()
+        if resolution is not None and (path, layer_names) in resolution.resolved_paths:
+            index, data = resolution.resolved_paths[(path, layer_names)]
+            resolution.dependencies.add_resolution(path, layer_names, data)  # For the dependencies of the document
+            return index, data
 
-        for layer in layers:
-            data = layer.load(path)
+        for index, layer in enumerate(layers):
+            with profile_span("layer", layer.name):
+                data = layer.load(path)
             if data is not None:
-                return data
+                if resolution is not None:
+                    resolution.resolved_paths[(path, layer_names)] = index, data
+                    resolution.dependencies.add_resolution(path, layer_names, data)
+                return index, data
 
         raise ValueError(f"Could not resolve {path}")
 
@@ -69,9 +114,16 @@ class PathResolver:
         """Returns the list of overlay layers."""
         return self._layers
 
-    def get_files(self) -> Dict:
-        """Return possible files for all layers."""
-        result = {}
-        for layer in self._layers:
-            result[layer.name] = layer.get_files()
-        return result
+    def get_files(self, package: Optional[str] = None, max_depth: Optional[int] = None) -> Dict:
+        """Return possible files for all layers.
+
+        The layers are walked in parallel threads, as the file system calls dominate.
+
+        :param package: If set, lists only the files of this package
+        :param max_depth: Number of folder levels to list per layer, counting the package folders
+        """
+        # Custom layers might not support the filters, so pass them only when they are used
+        filters = {"package": package, "max_depth": max_depth} if package is not None or max_depth is not None else {}
+        with ThreadPoolExecutor(max_workers=max(len(self._layers), 1)) as executor:
+            trees = list(executor.map(lambda layer: layer.get_files(**filters), self._layers))
+        return {layer.name: tree for layer, tree in zip(self._layers, trees)}
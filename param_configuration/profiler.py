@@ -0,0 +1,122 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ContextManager, Iterator, Optional, Union
+
+
+@dataclass
+class SpanStats:
+    """Aggregated timing of all the spans with the same category and name."""
+
+    category: str
+    name: str
+    calls: int = 0
+    total: float = 0.0
+    own: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Mean wall time of a call in seconds."""
+        return self.total / self.calls if self.calls else 0.0
+
+
+class Profiler:
+    """Records the wall time and the call counts of the resolution steps.
+
+    The spans are recorded per category, for example "file", "tag", "layer" or "eval", and per name, for example the
+    file path or the evaluated expression. Total time includes the nested spans, own time excludes them.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stacks: dict[int, list[float]] = {}  # Time spent in the nested spans, per thread
+        self._events: list[tuple[str, str, float, float, int]] = []
+        self.stats: dict[tuple[str, str], SpanStats] = {}
+
+    @contextmanager
+    def span(self, category: str, name: str) -> Iterator[None]:
+        """Records the time spent within the context."""
+        thread = threading.get_ident()
+        stack = self._stacks.setdefault(thread, [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += duration
+            with self._lock:
+                self._events.append((category, name, start - self._start, duration, thread))
+                stats = self.stats.get((category, name))
+                if stats is None:
+                    stats = self.stats[(category, name)] = SpanStats(category, name)
+                stats.calls += 1
+                stats.total += duration
+                stats.own += duration - nested
+
+    def hot_spots(self, category: Optional[str] = None) -> list[SpanStats]:
+        """Returns the aggregated spans sorted by their own time, the slowest first.
+
+        :param category: If given, returns only the spans of the category
+        """
+        stats = [each for each in self.stats.values() if category is None or each.category == category]
+        return sorted(stats, key=lambda each: each.own, reverse=True)
+
+    def chrome_trace(self) -> dict:
+        """Returns the recorded spans in Chrome trace event format, which can be opened in chrome://tracing or
+        Perfetto."""
+        pid = os.getpid()
+        events = [
+            {"name": name, "cat": category, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": pid, "tid": tid}
+            for category, name, start, duration, tid in self._events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Writes the recorded spans into a Chrome trace JSON file."""
+        Path(path).write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+
+
+_ACTIVE_PROFILER: ContextVar[Optional[Profiler]] = ContextVar("param_configuration_profiler", default=None)
+
+
+@contextmanager
+def profiling() -> Iterator[Profiler]:
+    """Records the resolutions run within the context with a new profiler."""
+    profiler = Profiler()
+    token = _ACTIVE_PROFILER.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE_PROFILER.reset(token)
+
+
+def profile_span(category: str, name: str) -> ContextManager[None]:
+    """Records the time spent within the context, if profiling is enabled. Otherwise, does nothing."""
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(category, name)
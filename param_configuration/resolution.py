@@ -0,0 +1,251 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional, Union
+
+
+class DependencyGraph:
+    """Graph of everything a resolution depended on.
+
+    The nodes are the loaded files and config:// paths, the environment variables and the ROS packages. An edge tells
+    that the source document depended on the target, and its label is the tag that caused it, for example "!include",
+    or "resolves" for the file that a config:// path was resolved into.
+    """
+
+    def __init__(self):
+        self.nodes: dict[str, dict[str, Any]] = {}
+        self.edges: dict[tuple[str, str], str] = {}
+
+    def add_node(self, node: str, kind: str, **attributes: Any) -> None:
+        """Add a node of the given kind, such as "file", "config", "env" or "package"."""
+        self.nodes[node] = {"kind": kind, **attributes}
+
+    def add_edge(self, source: str, target: str, label: str) -> None:
+        """Add an edge from the depending node to the node it depends on."""
+        self.edges.setdefault((source, target), label)
+
+    def roots(self) -> list[str]:
+        """Returns the nodes that no other node depends on, such as the top-level files."""
+        targets = {target for _, target in self.edges}
+        return [node for node in self.nodes if node not in targets]
+
+    def dependencies_of(self, node: str) -> list[tuple[str, str]]:
+        """Returns the nodes that the given node directly depends on, with the edge labels."""
+        return [(target, label) for (source, target), label in self.edges.items() if source == node]
+
+    def to_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """Returns the graph in a JSON serializable format."""
+        return {
+            "nodes": [{"id": node, **attributes} for node, attributes in self.nodes.items()],
+            "edges": [
+                {"source": source, "target": target, "label": label} for (source, target), label in self.edges.items()
+            ],
+        }
+
+    def to_dot(self) -> str:
+        """Returns the graph in Graphviz DOT format."""
+        shapes = {"file": "box", "config": "folder", "env": "diamond", "package": "component", "string": "note"}
+        lines = ["digraph dependencies {", "  rankdir=LR;"]
+        for node, attributes in self.nodes.items():
+            lines.append(f"  {_dot_quote(node)} [shape={shapes.get(attributes['kind'], 'ellipse')}];")
+        for (source, target), label in self.edges.items():
+            lines.append(f"  {_dot_quote(source)} -> {_dot_quote(target)} [label={_dot_quote(label)}];")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def _dot_quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class Dependencies:
+    """Records everything a resolution depended on: the files that were loaded, how the config:// paths were resolved,
+    the environment variables that were read and the ROS packages that were looked up."""
+
+    def __init__(self):
+        self.files: set[str] = set()
+        self.resolutions: dict[tuple[str, tuple[str, ...]], str] = {}
+        self.env: dict[str, Optional[str]] = {}
+        self.packages: dict[str, Optional[str]] = {}
+        self._file_scopes: list[set[str]] = []
+
+        self.graph = DependencyGraph()
+        # Nodes of the documents that are being parsed and the tags that are being constructed, innermost last
+        self._documents: list[str] = []
+        self._tags: list[str] = []
+
+    def add_file(self, path: Union[str, Path]) -> None:
+        """Record a YAML file that was read during the resolution."""
+        self.files.add(str(path))
+        if self._file_scopes:
+            self._file_scopes[-1].add(str(path))
+
+    def add_files(self, paths: set[str]) -> None:
+        """Record multiple YAML files that were read during the resolution."""
+        self.files |= paths
+        if self._file_scopes:
+            self._file_scopes[-1] |= paths
+
+    @contextmanager
+    def track_files(self) -> Iterator[set[str]]:
+        """Collects the files that are recorded within the context, including the nested contexts."""
+        files: set[str] = set()
+        self._file_scopes.append(files)
+        try:
+            yield files
+        finally:
+            self._file_scopes.pop()
+            if self._file_scopes:
+                self._file_scopes[-1] |= files
+
+    @contextmanager
+    def document(self, node: str, kind: str) -> Iterator[None]:
+        """Records the document as a dependency of the enclosing document, and the dependencies recorded within the
+        context as dependencies of this document."""
+        self.link(node, kind)
+        self._documents.append(node)
+        try:
+            yield
+        finally:
+            self._documents.pop()
+
+    @contextmanager
+    def tag(self, tag: str) -> Iterator[None]:
+        """Labels the dependencies recorded within the context with the tag that is being constructed."""
+        self._tags.append(tag)
+        try:
+            yield
+        finally:
+            self._tags.pop()
+
+    def link(self, node: str, kind: str, label: Optional[str] = None, **attributes: Any) -> None:
+        """Record a node in the dependency graph as a dependency of the document that is being parsed.
+
+        :param node: Name of the node, for example the file path
+        :param kind: Kind of the node, such as "file", "config", "env" or "package"
+        :param label: Label of the edge. Defaults to the tag that is being constructed.
+        :param attributes: Attributes of the node, such as the value of an environment variable
+        """
+        self.graph.add_node(node, kind, **attributes)
+        if self._documents:
+            self.graph.add_edge(self._documents[-1], node, label or (self._tags[-1] if self._tags else "load"))
+
+    def add_resolution(self, path: str, layer_names: tuple[str, ...], resolved: Union[str, Path]) -> None:
+        """Record that the config:// path was resolved into the given file or YAML string with the given layers."""
+        target = self.resolutions[(path, layer_names)] = resolution_target(resolved)
+        if isinstance(resolved, Path):
+            self.add_file(resolved)
+            self.link(target, "file", label="resolves")
+        else:
+            self.link(target, "string", label="resolves")
+
+    def add_env(self, name: str, value: Optional[str]) -> None:
+        """Record an environment variable that was read. None means that the variable was not set."""
+        self.env[name] = value
+        self.link(f"env:{name}", "env", value=value)
+
+    def add_package(self, package: str, share_directory: Optional[str]) -> None:
+        """Record a ROS package share directory that was looked up."""
+        self.packages[package] = share_directory
+        self.link(f"package:{package}", "package", share_directory=share_directory)
+
+
+class CachedDocument(NamedTuple):
+    """Document in the document cache of a resolution."""
+
+    document: Any
+    # Names of the overridden default layers, if the document depends on them
+    default_layer_names: Optional[tuple[str, ...]]
+    # All the files that the document was resolved from, including the nested documents
+    files: set[str]
+
+
+# The resolution only holds the state, which the loads and the tags update directly
+class Resolution:  # pylint: disable=too-few-public-methods
+    """State shared by a top-level Configuration.load and all the nested loads its tags trigger."""
+
+    def __init__(self, preserve_comments: bool = False):
+        """
+        :param preserve_comments: Parse all the files with the round-trip loader, so that the comments of the files
+            without tags are kept as well. By default, the files without tags are parsed with the faster safe loader.
+        """
+        self.preserve_comments = preserve_comments
+        self.dependencies = Dependencies()
+
+        # Loaded documents by file and configuration layers, so that each file is parsed at most once
+        self.documents: dict[tuple, CachedDocument] = {}
+        # Resolved config:// paths and the indexes of the layers that had them, by path and configuration layers
+        self.resolved_paths: dict[tuple[str, tuple[str, ...]], tuple[int, Union[str, Path]]] = {}
+        # Overrides the configuration layers that are used by the loads that don't specify the layers
+        self.default_layers: Optional[list] = None
+        self.default_layer_uses = 0
+        self.load_count = 0
+
+
+_ACTIVE_RESOLUTION: ContextVar[Optional[Resolution]] = ContextVar("param_configuration_resolution", default=None)
+
+
+def active_resolution() -> Optional[Resolution]:
+    """Returns the resolution that is currently running in this thread or task, if any."""
+    return _ACTIVE_RESOLUTION.get()
+
+
+def current_dependencies() -> Optional[Dependencies]:
+    """Returns the dependency record of the running resolution, if any."""
+    resolution = _ACTIVE_RESOLUTION.get()
+    return resolution.dependencies if resolution is not None else None
+
+
+@contextmanager
+def resolution_scope(resolution: Optional[Resolution] = None) -> Iterator[Resolution]:
+    """Activates a new resolution, or joins the already running one when called from a nested load.
+
+    :param resolution: Resolution to activate instead of a new one, for example to reuse its document cache
+    """
+    if _ACTIVE_RESOLUTION.get() is not None:
+        yield _ACTIVE_RESOLUTION.get()
+        return
+
+    resolution = resolution if resolution is not None else Resolution()
+    token = _ACTIVE_RESOLUTION.set(resolution)
+    try:
+        yield resolution
+    finally:
+        _ACTIVE_RESOLUTION.reset(token)
+
+
+@contextmanager
+def tag_scope(tag: str) -> Iterator[None]:
+    """Labels the dependencies recorded within the context with the tag, if a resolution is running."""
+    dependencies = current_dependencies()
+    if dependencies is None:
+        yield
+        return
+    with dependencies.tag(tag):
+        yield
+
+
+def resolution_target(resolved: Union[str, Path]) -> str:
+    """Returns a comparable representation of a path resolution result.
+
+    Layers return either a path to the file, or the YAML contents as a string.
+    """
+    if isinstance(resolved, Path):
+        return str(resolved)
+    return "sha256:" + hashlib.sha256(resolved.encode("utf-8")).hexdigest()
@@ -0,0 +1,75 @@
+import json
+import os
+from enum import Enum
+from pathlib import Path
+from typing import Annotated, Optional
+
+# Thirdparty
+import typer
+from rich.console import Console
+from rich.text import Text
+from rich.tree import Tree
+
+# Parameter Configuration
+from param_configuration.configuration import Configuration
+from param_configuration.resolution import DependencyGraph
+from param_configuration.temp_config_env import TempConfigEnv
+
+console = Console()
+
+
+class GraphFormat(str, Enum):
+    """Output formats of the dependency graph."""
+
+    TREE = "tree"
+    DOT = "dot"
+    JSON = "json"
+
+
+def print_dependencies(
+    config_file: str,
+    config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None,
+    output_format: Annotated[GraphFormat, typer.Option("--format", help="output format")] = GraphFormat.TREE,
+    output: Annotated[Optional[Path], typer.Option(help="write the graph into a file")] = None,
+):
+    """Prints the files, tags, environment variables and ROS packages that the configuration depends on."""
+    if not config_file.startswith("/") and not config_file.startswith("config://"):
+        config_file = os.path.abspath(config_file)
+
+    if config_directory is not None:
+        with TempConfigEnv(path=Path(config_directory)):
+            _, graph = Configuration().load_with_dependencies(config_file)
+    else:
+        _, graph = Configuration().load_with_dependencies(config_file)
+
+    if output_format == GraphFormat.TREE:
+        tree = Tree(f"[bold]Dependencies of {config_file}")
+        for root in graph.roots():
+            build_tree(graph, root, tree.add(Text(root, "green")), visited={root})
+        console.print(tree)
+        return
+
+    text = graph.to_dot() if output_format == GraphFormat.DOT else json.dumps(graph.to_dict(), indent=2) + "\n"
+    if output is None:
+        print(text, end="")
+    else:
+        output.write_text(text, encoding="utf-8")
+        console.print(f"[bold][green] Wrote the dependency graph to {output}")
+
+
+def build_tree(graph: DependencyGraph, node: str, tree: Tree, visited: set[str]) -> Tree:
+    """Adds the dependencies of the node into the tree. The dependencies of an already shown node are not repeated."""
+    for target, label in graph.dependencies_of(node):
+        attributes = graph.nodes[target]
+        text = Text.assemble((f"{label} ", "magenta"), (target, "green"))
+        if attributes["kind"] == "env":
+            text.append(f" = {attributes['value']}")
+        elif attributes["kind"] == "package":
+            text.append(f" -> {attributes['share_directory']}")
+
+        if target in visited:
+            tree.add(text.append(" (see above)", "dim"))
+        else:
+            visited.add(target)
+            build_tree(graph, target, tree.add(text), visited)
+    return tree
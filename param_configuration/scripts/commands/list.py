@@ -14,7 +14,13 @@ from param_configuration.temp_config_env import TempConfigEnv
 console = Console()
 
 
-def list_config_files(config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None):
+def list_config_files(
+    config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None,
+    package: Annotated[Optional[str], typer.Option(help="list only the files of this package")] = None,
+    depth: Annotated[
+        Optional[int], typer.Option(help="number of folder levels to list per layer, counting the package folders")
+    ] = None,
+):
     """Prints the tree of the current config structure."""
 
     if config_directory is not None:
@@ -25,7 +31,7 @@ def list_config_files(config_directory: Annotated[Optional[str], typer.Option(he
     else:
         configuration = Configuration()
 
-    files_and_folders = configuration.list_files()
+    files_and_folders = configuration.list_files(package=package, max_depth=depth)
     tree = Tree("Current config structure")
     build_tree(tree=tree, files_and_folders=files_and_folders)
     console.print(tree)
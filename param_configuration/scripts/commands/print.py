@@ -5,10 +5,10 @@ from typing import Annotated, Optional
 # Thirdparty
 import typer
 from rich.console import Console
-from rich.syntax import Syntax
 
 # Parameter Configuration
 from param_configuration.configuration import Configuration
+from param_configuration.resolution import Resolution, resolution_scope
 from param_configuration.temp_config_env import TempConfigEnv
 
 console = Console()
@@ -25,13 +25,18 @@ def print_config(
     if config_directory is not None:
         console.print(f"[bold][red] Got custom config directory: {config_directory}")
 
-        with TempConfigEnv(path=Path(config_directory)):
+        with TempConfigEnv(path=Path(config_directory)), resolution_scope(Resolution(preserve_comments=True)):
             configuration = Configuration()
             data = configuration.load(config_file)
 
     else:
-        configuration = Configuration()
-        data = configuration.load(config_file)
+        with resolution_scope(Resolution(preserve_comments=True)):
+            configuration = Configuration()
+            data = configuration.load(config_file)
+
+    # pylint: disable=import-outside-toplevel
+    # Thirdparty
+    from rich.syntax import Syntax  # Slow to import, so imported only by this command
 
     console.print(f"[bold][white] Contents of: {config_file}")
     yaml_string = configuration.dump(data)
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+from typing import Annotated, Optional
+
+# Thirdparty
+import typer
+from rich.console import Console
+from rich.table import Table
+
+# Parameter Configuration
+from param_configuration.configuration import get_resolved_yaml
+from param_configuration.profiler import profiling
+from param_configuration.temp_config_env import TempConfigEnv
+
+console = Console()
+
+
+def profile_config(
+    config_file: str,
+    config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None,
+    trace: Annotated[Optional[Path], typer.Option(help="write a Chrome trace JSON file")] = None,
+    category: Annotated[Optional[str], typer.Option(help="show only file, tag, layer, eval, package, ...")] = None,
+    top: Annotated[int, typer.Option(help="number of hot spots to show")] = 30,
+):
+    """Resolves the configuration like in a launch file and prints where the time was spent."""
+    if not config_file.startswith("/") and not config_file.startswith("config://"):
+        config_file = os.path.abspath(config_file)
+
+    os.environ.pop("PARAM_CACHE_DIR", None)  # Profile the resolution instead of the cache lookup
+    with profiling() as profiler:
+        if config_directory is not None:
+            with TempConfigEnv(path=Path(config_directory)):
+                get_resolved_yaml(config_file)
+        else:
+            get_resolved_yaml(config_file)
+
+    table = Table("Category", "Name", "Calls", "Own (ms)", "Total (ms)", "Mean (ms)", title=f"Hot spots: {config_file}")
+    for stats in profiler.hot_spots(category)[:top]:
+        table.add_row(
+            stats.category,
+            stats.name,
+            str(stats.calls),
+            f"{stats.own * 1000:.2f}",
+            f"{stats.total * 1000:.2f}",
+            f"{stats.mean * 1000:.3f}",
+        )
+    console.print(table)
+
+    if trace is not None:
+        profiler.write_chrome_trace(trace)
+        console.print(f"[bold][green] Wrote Chrome trace to {trace}")
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+from typing import Annotated, List, Optional
+
+# Thirdparty
+import typer
+from rich.console import Console
+
+# Parameter Configuration
+from param_configuration.fleet import FleetRenderer
+
+console = Console()
+
+
+def render_fleet(  # pylint: disable=too-many-arguments
+    config_files: Annotated[List[str], typer.Argument(help="config:// paths of the parameter files to render")],
+    *,
+    devices: Annotated[
+        Optional[List[str]],
+        typer.Option("--devices", help="glob of the device folders in the config dir, can be given multiple times"),
+    ] = None,
+    output_directory: Annotated[str, typer.Option(help="directory to write the resolved files to")] = "resolved",
+    config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None,
+    workers: Annotated[int, typer.Option(help="number of processes to use")] = os.cpu_count() or 1,
+    snapshot: Annotated[bool, typer.Option(help="write binary snapshots instead of YAML files")] = False,
+):
+    """Resolves the parameter files for many devices and writes one resolved file per device and parameter file.
+
+    \f
+    :raises typer.BadParameter: If the config directory is not given or has no matching device folders
+    """
+    config_directory = config_directory or os.environ.get("PARAM_CONFIG_DIR")
+    if not config_directory:
+        raise typer.BadParameter("Give --config-directory or set PARAM_CONFIG_DIR environmental variable")
+
+    renderer = FleetRenderer(config_directory=Path(config_directory), output_directory=Path(output_directory))
+    device_folders = renderer.find_devices(devices or ["*"])
+    if not device_folders:
+        raise typer.BadParameter(f"No device folders found in {config_directory}")
+
+    console.print(f"[bold][white] Rendering {len(config_files)} files for {len(device_folders)} devices")
+    written = renderer.render(config_files=config_files, devices=device_folders, workers=workers, snapshot=snapshot)
+    console.print(f"[bold][green] Wrote {len(written)} files to {output_directory}")
@@ -0,0 +1,60 @@
+import difflib
+import os
+import time
+from pathlib import Path
+from typing import Annotated, Any, Optional
+
+# Thirdparty
+import typer
+from rich.console import Console
+
+# Parameter Configuration
+from param_configuration.configuration import Configuration
+from param_configuration.temp_config_env import TempConfigEnv
+from param_configuration.watch import ConfigWatcher
+
+console = Console()
+
+
+def watch_config(
+    config_file: str,
+    config_directory: Annotated[Optional[str], typer.Option(help="path to the config dir")] = None,
+    interval: Annotated[float, typer.Option(help="seconds between checking the files for changes")] = 0.5,
+):
+    """Prints the evaluated configuration, and a diff to the previous one whenever the configuration changes."""
+    if not config_file.startswith("/") and not config_file.startswith("config://"):
+        config_file = os.path.abspath(config_file)
+
+    try:
+        if config_directory is not None:
+            with TempConfigEnv(path=Path(config_directory)):
+                _watch(config_file, interval)
+        else:
+            _watch(config_file, interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def _watch(config_file: str, interval: float) -> None:
+    configuration = Configuration()
+    watcher = ConfigWatcher(config_file)
+    previous = configuration.dump(watcher.resolve())
+    console.print(f"[bold][white] Contents of: {config_file}")
+    console.print(previous, markup=False, highlight=False)
+    console.print(f"[bold][white] Watching for changes every {interval} s. Press Ctrl+C to stop.")
+
+    while True:
+        time.sleep(interval)
+        start = time.perf_counter()
+        data: Any = watcher.poll()
+        if data is None:
+            continue
+        duration = time.perf_counter() - start
+
+        current = configuration.dump(data)
+        diff = difflib.unified_diff(
+            previous.splitlines(keepends=True), current.splitlines(keepends=True), "previous", "current"
+        )
+        console.print(f"[bold][green] Resolved again in {duration * 1000:.1f} ms")
+        console.print("".join(diff) or "No changes in the resolved configuration\n", markup=False, highlight=False)
+        previous = current
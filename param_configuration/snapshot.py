@@ -0,0 +1,211 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Compact binary snapshots of resolved configurations.
+
+A snapshot stores the resolved tree of plain values, so it can be loaded without parsing YAML. The format is stable
+and doesn't use pickle, so snapshots can be shared between machines and Python versions, and loading an untrusted
+snapshot can't run any code. All the numbers are little-endian:
+
+* Header: the magic bytes "PCSNAP", the format version (uint8) and the number of strings (uint32)
+* String table: the length (uint32) and the UTF-8 bytes of each distinct string, for example the parameter names
+* Root value, where each value starts with a type code byte:
+
+  * "N" None, "T" true and "F" false
+  * "i" int64, "I" arbitrarily large int as the length (uint32) and the ASCII decimal digits
+  * "f" float64
+  * "s" string as an index to the string table (uint32)
+  * "l" list as the number of items (uint32) and the items
+  * "m" mapping as the number of items (uint32) and the keys and values in turns
+"""
+import numbers
+import struct
+from pathlib import Path
+from typing import Any, Callable, Union
+
+# Thirdparty
+from ruamel.yaml.scalarbool import ScalarBoolean
+
+MAGIC = b"PCSNAP"
+# Increase when the format changes
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".pcsnap"
+
+_HEADER = struct.Struct("<6sBI")
+_UINT32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_INT64_RANGE = range(-(2**63), 2**63)
+
+
+def dumps(data: Any) -> bytes:
+    """Serializes the resolved configuration into a snapshot.
+
+    :param data: Resolved configuration, containing mappings, lists, strings, numbers, booleans and None
+    :return: Snapshot bytes
+    :raises TypeError: If the configuration contains values of any other type
+    """
+    strings: dict[str, int] = {}
+    body = bytearray()
+    _encode(data, body, strings)
+
+    output = bytearray(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(strings)))
+    for string in strings:
+        encoded = string.encode("utf-8")
+        output += _UINT32.pack(len(encoded))
+        output += encoded
+    output += body
+    return bytes(output)
+
+
+def loads(snapshot: bytes) -> Any:
+    """Loads the configuration from a snapshot into plain dictionaries and lists.
+
+    :param snapshot: Snapshot bytes created by dumps
+    :return: Resolved configuration
+    :raises ValueError: If the data is not a valid snapshot of a supported version
+    """
+    try:
+        magic, version, string_count = _HEADER.unpack_from(snapshot, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a configuration snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+
+        offset = _HEADER.size
+        strings = []
+        for _ in range(string_count):
+            (length,) = _UINT32.unpack_from(snapshot, offset)
+            offset += 4
+            strings.append(str(snapshot[offset : offset + length], "utf-8"))
+            offset += length
+
+        data, offset = _decode(snapshot, offset, strings)
+    except (struct.error, IndexError, UnicodeDecodeError) as error:
+        raise ValueError("Truncated or corrupted configuration snapshot") from error
+    except RecursionError as error:  # The values are decoded recursively
+        raise ValueError("Too deeply nested configuration snapshot") from error
+
+    if offset != len(snapshot):
+        raise ValueError("Unexpected data after the end of the configuration snapshot")
+    return data
+
+
+def write_snapshot(data: Any, path: Union[str, Path]) -> None:
+    """Writes the resolved configuration into a snapshot file."""
+    Path(path).write_bytes(dumps(data))
+
+
+def read_snapshot(path: Union[str, Path]) -> Any:
+    """Reads the configuration from a snapshot file."""
+    return loads(Path(path).read_bytes())
+
+
+def _encode(value: Any, output: bytearray, strings: dict[str, int]) -> None:
+    # The ruamel and numpy types are subclasses or virtual subclasses of the plain types
+    if isinstance(value, str):
+        index = strings.setdefault(value, len(strings))
+        output += b"s" + _UINT32.pack(index)
+    elif isinstance(value, dict):
+        output += b"m" + _UINT32.pack(len(value))
+        for key, item in value.items():
+            _encode(key, output, strings)
+            _encode(item, output, strings)
+    elif isinstance(value, (list, tuple)):
+        output += b"l" + _UINT32.pack(len(value))
+        for item in value:
+            _encode(item, output, strings)
+    elif value is None:
+        output += b"N"
+    elif isinstance(value, (bool, ScalarBoolean)):
+        output += b"T" if value else b"F"
+    elif isinstance(value, numbers.Integral):
+        value = int(value)
+        if value in _INT64_RANGE:
+            output += b"i" + _INT64.pack(value)
+        else:
+            digits = str(value).encode("ascii")
+            output += b"I" + _UINT32.pack(len(digits)) + digits
+    elif isinstance(value, numbers.Real):
+        output += b"f" + _FLOAT64.pack(float(value))
+    else:
+        raise TypeError(f"Values of type {type(value).__name__} can't be stored in a configuration snapshot")
+
+
+def _decode(snapshot: bytes, offset: int, strings: list[str]) -> tuple[Any, int]:
+    return _DECODERS[snapshot[offset]](snapshot, offset + 1, strings)
+
+
+def _decode_string(snapshot: bytes, offset: int, strings: list[str]) -> tuple[str, int]:
+    return strings[_UINT32.unpack_from(snapshot, offset)[0]], offset + 4
+
+
+def _decode_mapping(snapshot: bytes, offset: int, strings: list[str]) -> tuple[dict, int]:
+    (count,) = _UINT32.unpack_from(snapshot, offset)
+    offset += 4
+    mapping = {}
+    for _ in range(count):
+        key, offset = _DECODERS[snapshot[offset]](snapshot, offset + 1, strings)
+        value, offset = _DECODERS[snapshot[offset]](snapshot, offset + 1, strings)
+        try:
+            mapping[key] = value
+        except TypeError as error:  # Only a corrupted snapshot can have a list or a mapping as a key
+            raise ValueError("Unhashable mapping key in the configuration snapshot") from error
+    return mapping, offset
+
+
+def _decode_list(snapshot: bytes, offset: int, strings: list[str]) -> tuple[list, int]:
+    (count,) = _UINT32.unpack_from(snapshot, offset)
+    offset += 4
+    items = []
+    for _ in range(count):
+        item, offset = _DECODERS[snapshot[offset]](snapshot, offset + 1, strings)
+        items.append(item)
+    return items, offset
+
+
+def _decode_float(snapshot: bytes, offset: int, _strings: list[str]) -> tuple[float, int]:
+    return _FLOAT64.unpack_from(snapshot, offset)[0], offset + 8
+
+
+def _decode_int(snapshot: bytes, offset: int, _strings: list[str]) -> tuple[int, int]:
+    return _INT64.unpack_from(snapshot, offset)[0], offset + 8
+
+
+def _decode_large_int(snapshot: bytes, offset: int, _strings: list[str]) -> tuple[int, int]:
+    (length,) = _UINT32.unpack_from(snapshot, offset)
+    offset += 4
+    return int(snapshot[offset : offset + length]), offset + length
+
+
+def _decode_unknown(snapshot: bytes, offset: int, _strings: list[str]) -> tuple[Any, int]:
+    raise ValueError(f"Unknown value type {snapshot[offset - 1]} in the configuration snapshot")
+
+
+def _constant(value: Any) -> Callable[[bytes, int, list[str]], tuple[Any, int]]:
+    return lambda _snapshot, offset, _strings: (value, offset)
+
+
+# Decoder of each type code byte, called with the offset after the type code
+_DECODERS: list[Callable[[bytes, int, list[str]], tuple[Any, int]]] = [_decode_unknown] * 256
+_DECODERS[ord("N")] = _constant(None)
+_DECODERS[ord("T")] = _constant(True)
+_DECODERS[ord("F")] = _constant(False)
+_DECODERS[ord("i")] = _decode_int
+_DECODERS[ord("I")] = _decode_large_int
+_DECODERS[ord("f")] = _decode_float
+_DECODERS[ord("s")] = _decode_string
+_DECODERS[ord("l")] = _decode_list
+_DECODERS[ord("m")] = _decode_mapping
@@ -13,20 +13,28 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
+import ast
+import functools
 import math
 import os
-from typing import Any
-
-# ROS
-from ament_index_python.packages import get_package_share_directory
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
 # Thirdparty
-import numpy
-import simpleeval
-from ruamel.yaml import BaseConstructor, MappingNode
+from ruamel.yaml import BaseConstructor, MappingNode, Node, ScalarNode, SequenceNode
 
 # Parameter Configuration
+from param_configuration.ament_index import get_package_share_directory
 from param_configuration.configuration import ConfigConstructor, Configuration, get_resolved_yaml
+from param_configuration.profiler import profile_span
+from param_configuration.resolution import current_dependencies
+
+if TYPE_CHECKING:
+    # Thirdparty
+    import simpleeval
+
+# pylint: disable=import-outside-toplevel
+# numpy and simpleeval are imported only once an expression is evaluated, as they are slow to import
 
 
 class Dotdict(dict):
@@ -39,15 +47,128 @@ class Dotdict(dict):
         return dict.get(item, *args, **kwargs)
 
 
-def additional_names(var: dict[str, Any]) -> dict[str, Any]:
+class DocumentVariables(Mapping):
+    """Variables defined under the ".variables" key of the document that is being loaded.
+
+    The variables are constructed only when they are used for the first time, so that they can refer to each other
+    regardless of their order, and each of them is constructed only once per document.
+    """
+
+    def __init__(self, loader: BaseConstructor, root: Optional[Node]):
+        self._loader = loader
+        self._values: dict[str, Any] = {}
+        self._items: list[Node] = []
+
+        if isinstance(root, MappingNode):
+            for key_node, value_node in root.value:
+                if isinstance(key_node, ScalarNode) and key_node.value == ".variables":
+                    if isinstance(value_node, SequenceNode):
+                        self._items = value_node.value
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._construct(name)
+        return self._values[name]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+    def __iter__(self) -> Iterator[str]:
+        names = []
+        for item in self._items:
+            for name in self._construct_item(item) or {}:
+                if name not in names:
+                    names.append(name)
+        return iter(names)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def _construct(self, name: str) -> Any:
+        """Constructs the variable, later definitions overriding the earlier ones."""
+        for item in reversed(self._items):
+            if isinstance(item, MappingNode) and item.tag == "tag:yaml.org,2002:map":
+                # Plain mappings: construct only the requested value
+                for key_node, value_node in reversed(item.value):
+                    if isinstance(key_node, ScalarNode) and key_node.value == name:
+                        if value_node in self._loader.recursive_objects:  # Variable refers to itself
+                            raise KeyError(name)
+                        return self._loader.construct_object(value_node, deep=True)
+            else:
+                # Tagged items, such as !include, need to be constructed to know the variables they define
+                variables = self._construct_item(item)
+                if variables and name in variables:
+                    return variables[name]
+        raise KeyError(name)
+
+    def _construct_item(self, item: Node) -> Optional[dict]:
+        if item in self._loader.recursive_objects:
+            return None
+        return self._loader.construct_object(item, deep=True)
+
+
+class RecordingEnviron(Mapping):
+    """Read-only view to the environment variables, which records the read variables as dependencies of the running
+    resolution."""
+
+    def __getitem__(self, name: str) -> str:
+        value = os.environ.get(name)
+        dependencies = current_dependencies()
+        if dependencies is not None:
+            dependencies.add_env(name, value)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(os.environ)
+
+    def __len__(self) -> int:
+        return len(os.environ)
+
+
+def path_to(package: str) -> str:
+    """Returns the share directory of the ROS package and records it as a dependency of the running resolution."""
+    share_directory: Optional[str] = None
+    try:
+        with profile_span("package", package):
+            share_directory = get_package_share_directory(package)
+    finally:
+        dependencies = current_dependencies()
+        if dependencies is not None:
+            dependencies.add_package(package, share_directory)
+    return share_directory
+
+
+class EvalNames(dict):
+    """Names available for simple eval. numpy is imported only when an expression uses np."""
+
+    def __missing__(self, key: str) -> Any:
+        if key != "np":
+            raise KeyError(key)
+        # Thirdparty
+        import numpy
+
+        self["np"] = numpy
+        return numpy
+
+
+def additional_names(var: Mapping[str, Any]) -> dict[str, Any]:
     """Function providing additional variables for simple eval."""
-    return {"env": os.environ, "m": math, "np": numpy, "var": Dotdict(var)}
+    if not isinstance(var, DocumentVariables):
+        var = Dotdict(var)
+    return EvalNames(env=RecordingEnviron(), m=math, var=var)
 
 
 def additional_functions() -> dict[str, Any]:
     """Function providing additional function for simple eval."""
     return {
-        "path_to": get_package_share_directory,
+        "path_to": path_to,
         "join": os.path.join,
         "round": round,
         "get_resolved_yaml": get_resolved_yaml,
@@ -55,6 +176,19 @@ def additional_functions() -> dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> ast.AST:
+    """Parses the expression into a syntax tree for simple eval.
+
+    The parsed trees are cached, as the same expressions are often repeated across the configuration files.
+    """
+    # Thirdparty
+    import simpleeval
+
+    # Parsing doesn't depend on the names nor functions of the evaluator
+    return simpleeval.SimpleEval.parse(expression)
+
+
 # pylint: disable=too-few-public-methods
 # Fine for inheritance
 
@@ -64,53 +198,54 @@ class EvalConfigConstructor(ConfigConstructor, tag="!eval"):
 
     def __init__(self):
         super().__init__()
-        self._vars = {}
+        self._vars: Optional[DocumentVariables] = None
+        self._evaluator: Optional["simpleeval.EvalWithCompoundTypes"] = None
+        self._evaluating = False
 
     def constructor(self, tag_value: str, file: str, loader: BaseConstructor) -> Any:
         """Constructs the !eval tag."""
-        # Resolve variables in the file
-        self._vars = self.extract_variables(loader)
-
-        default_functions = simpleeval.DEFAULT_FUNCTIONS
-        default_functions.update(additional_functions())
-        res = self.eval_with_compound_types(
-            tag_value, functions=default_functions, names=additional_names(var=self._vars)
-        )
-        return res
+        # A constructor instance is created for each loaded file, so the variables and the evaluator are shared by all
+        # the !eval tags of the file
+        if self._vars is None:
+            self._vars = self.extract_variables(loader)
+
+        evaluator = self._evaluator
+        if evaluator is None or self._evaluating:  # Variables using !eval are evaluated while the evaluator is in use
+            # Thirdparty
+            import simpleeval
+
+            evaluator = simpleeval.EvalWithCompoundTypes(
+                functions={**simpleeval.DEFAULT_FUNCTIONS, **additional_functions()},
+                names=additional_names(var=self._vars),
+            )
+            if self._evaluator is None:
+                self._evaluator = evaluator
+
+        was_evaluating, self._evaluating = self._evaluating, True
+        try:
+            with profile_span("eval", tag_value):
+                return evaluator.eval(tag_value, previously_parsed=compile_expression(tag_value))
+        finally:
+            self._evaluating = was_evaluating
 
     @staticmethod
-    def extract_variables(loader) -> dict:
-        """Extracts variables from a YAML loader. Variable loading works slightly differently for !overlay tagged files
-        and for regular files.
+    def extract_variables(loader) -> DocumentVariables:
+        """Extracts variables from the ".variables" key of the document that the YAML loader is constructing.
 
         :param loader: The YAML loader containing the data.
         :type loader: Loader
-        :return: The extracted variables.
+        :return: The extracted variables, which are constructed once they are used.
         """
-        variables = {}
-        new_node = list(loader.recursive_objects.keys())[0]
-        nodes = [new_node] + list(loader.constructed_objects.keys())
-        for node in nodes:
-            if not isinstance(node, MappingNode):
-                continue
-
-            for key_node, value_node in node.value:
-                key = loader.construct_object(key_node, deep=True)
-                if key != ".variables":
-                    continue
-
-                yaml_seq = list(loader.construct_yaml_seq(node=value_node))[0]
-                if yaml_seq:
-                    for var in yaml_seq:
-                        if var:
-                            variables |= var
-        return variables
+        return DocumentVariables(loader, root=getattr(loader, "config_root", None))
 
     @staticmethod
     def eval_with_compound_types(tag_value: str, functions: dict[str, Any], names: dict[str, Any]) -> Any:
         """Evaluates the tag value with compound types."""
+        # Thirdparty
+        import simpleeval
+
         obj = simpleeval.EvalWithCompoundTypes(functions=functions, names=names)
-        return obj.eval(tag_value)
+        return obj.eval(tag_value, previously_parsed=compile_expression(tag_value))
 
 
 # Add the constructor.
@@ -13,6 +13,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
+import copy
 
 # Thirdparty
 from ruamel.yaml import BaseConstructor
@@ -30,14 +31,15 @@ class FromConfigConstructor(ConfigConstructor, tag="!from"):
     def constructor(self, tag_value: str, file: str, loader: BaseConstructor):
         file, fields = tag_value.split(" ")
         fields = fields.split(".")  # Split for nested fields
-        data = Configuration().load(file)
+        # Only a part of the file is needed, so avoid copying the whole document shared with the other tags
+        data = Configuration().load_shared(file)
 
         try:
             for field in fields:
                 data = data[field]
         except KeyError as e:
             raise RuntimeError(f"Could not find {field} in {file}." f"Possible keys are {data}") from e
-        return data
+        return copy.deepcopy(data)
 
 
 Configuration().add_config_constructor(const=FromConfigConstructor)
@@ -17,7 +17,7 @@ from pathlib import Path
 
 # Parameter Configuration
 from param_configuration.configuration import ConfigMultiConstructor, Configuration
-from param_configuration.utils import merge_left
+from param_configuration.utils import merged
 
 # pylint: disable=too-few-public-methods
 # Fine for inheritance
@@ -28,11 +28,7 @@ class MergeMultiConfigConstructor(ConfigMultiConstructor, tag="!merge"):
 
     def constructor(self, items: str, file: Path):
         # We assume that the fist entry is the main one.
-        config = items[0]
-        for i in items[1:]:
-            merge_left(items[0], i)
-
-        return config
+        return merged(items[0], *items[1:])
 
 
 Configuration().add_config_multi_constructor(multi_const=MergeMultiConfigConstructor)
@@ -13,29 +13,78 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
+from contextvars import ContextVar
+from typing import Optional
+
 # Thirdparty
 from ruamel.yaml import BaseConstructor
 
 # Parameter Configuration
 from param_configuration.configuration import ConfigConstructor, Configuration
-from param_configuration.utils import merge_left
+from param_configuration.path_resolver import PathResolver
+from param_configuration.utils import merged
 
 # pylint: disable=too-few-public-methods
 # Fine for inheritance
 
+# Document whose !overlay items are being read for the layer stack of a document above it, by path and layer names
+_READING_ITEMS_OF: ContextVar[Optional[tuple[str, tuple[str, ...]]]] = ContextVar(
+    "param_configuration_overlay_items", default=None
+)
+
+
+class OverlayItems(list):
+    """The !overlay items of a document, without the layers below merged into them."""
+
+    def __init__(self, items: list, layer_index: int):
+        """
+        :param items: The overlay items
+        :param layer_index: Index of the layer that has the document, within the layers it was loaded with
+        """
+        super().__init__(items)
+        self.layer_index = layer_index
+
 
 class OverlayConfigConstructor(ConfigConstructor, tag="!overlay"):
-    """The !overlay directive makes it possible to overlay files from different layers."""
+    """The !overlay directive makes it possible to overlay files from different layers.
+
+    Instead of every overlaying document loading the merged layers below it, the topmost document reads the overlay
+    items of all the documents down the layer stack and merges them into the base document in a single pass. Each
+    document is parsed once, and the mappings along the overridden paths are copied once, however deep the stack is.
+    """
 
     def constructor(self, tag_value: str, file: str, loader: BaseConstructor):
-        underlay = Configuration().load(self.file, config_layers=self.config_layers[1:])
-        for i in tag_value:
-            merge_left(underlay, i)
-        return underlay
+        if not str(self.file).startswith("config:"):
+            # The underlay is shared with the other documents that overlay it, so it is not copied nor modified
+            return merged(Configuration().load_shared(self.file, config_layers=self.config_layers[1:]), *tag_value)
+
+        overlays = [OverlayItems(tag_value, self._layer_index())]
+        layers = self.config_layers
+        while True:
+            layers = layers[overlays[-1].layer_index + 1 :]
+            token = _READING_ITEMS_OF.set((str(self.file), tuple(layer.name for layer in layers)))
+            try:
+                document = Configuration().load_shared(self.file, config_layers=layers, variant="overlay-items")
+            finally:
+                _READING_ITEMS_OF.reset(token)
+
+            if not isinstance(document, OverlayItems):
+                break
+            overlays.append(document)
+
+        # The documents are shared with the other documents that overlay them, so they are not copied nor modified
+        return merged(document, *[items for overlay in reversed(overlays) for items in overlay])
 
     def __call__(self, loader, node):
         items = list(loader.construct_yaml_map(node=node))
+        layer_names = tuple(layer.name for layer in self.config_layers)
+        if node is loader.config_root and _READING_ITEMS_OF.get() == (str(self.file), layer_names):
+            return OverlayItems(items, self._layer_index())
         return self.constructor(tag_value=items, file=node.end_mark.name, loader=loader)
 
+    def _layer_index(self) -> int:
+        """Returns the index of the layer that has this document, within the layers it was loaded with."""
+        return PathResolver().resolve_layer(str(self.file), self.config_layers)[0]
+
 
 Configuration().add_config_constructor(const=OverlayConfigConstructor)
@@ -13,51 +13,95 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 #  ------------------------------------------------------------------
+import os
+import stat
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 
-def merge_left(keys_a, keys_b, path=None):
-    """Merges b into a where b overwrites a."""
-    if path is None:
-        path = []
+def merge_left(keys_a: dict, keys_b: dict, path: Optional[list] = None) -> dict:
+    """Merges b into a where b overwrites a.
 
-    for key in keys_b:
-        if key in keys_a:
-            if isinstance(keys_a[key], dict) and isinstance(keys_b[key], dict):
-                merge_left(keys_a[key], keys_b[key], path + [str(key)])
+    :param keys_a: Mapping that is updated in place
+    :param keys_b: Mapping whose values overwrite the values of a
+    :param path: Deprecated and ignored. Kept so that the existing callers keep working.
+    """
+    del path  # The nested mappings are merged without recursion, so their path is not tracked anymore
+    stack = [(keys_a, keys_b)]
+    while stack:
+        target, source = stack.pop()
+        for key, value in source.items():
+            if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+                stack.append((target[key], value))
             else:
-                keys_a[key] = keys_b[key]
-        else:
-            keys_a[key] = keys_b[key]
+                target[key] = value
     return keys_a
 
 
-def walk_directory(directory: Path, tree=None) -> Dict:
+def merged(keys_a, *overlays):
+    """Returns a merge of the overlays into a, in order, where the later ones overwrite the earlier ones, without
+    modifying any of them.
+
+    Only the mappings on the paths to the overwritten keys are copied, and each of them at most once however many
+    overlays change it, so a whole stack of layers is cheapest to merge in a single call. The other values are shared
+    with the inputs, so merging a large base with a small overlay is cheap, and the same base can be merged with many
+    overlays. The result must therefore be treated as read-only, unless it is deep copied first.
+    """
+    result = keys_a.copy()
+    # The copies made by this merge, by id, which the later overlays can modify in place
+    owned = {id(result): result}
+    for keys_b in overlays:
+        stack = [(result, keys_b)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+                    if id(target[key]) not in owned:  # Copy on write, the original is shared with the inputs
+                        target[key] = target[key].copy()
+                        owned[id(target[key])] = target[key]
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
+    return result
+
+
+def walk_directory(directory: Path, tree: Optional[Dict] = None, max_depth: Optional[int] = None) -> Dict:
     """Recursively build a Tree with directory contents.
 
     Lists only YAML files
+
+    :param directory: Directory to walk
+    :param tree: Tree to add the contents into. If None, creates a new one.
+    :param max_depth: Number of subdirectory levels to include. If None, includes all of them.
     """
-    # Sort dirs first then by filename
     if tree is None:
         tree = {"__files": []}
-    paths = sorted(
-        Path(directory).iterdir(),
-        key=lambda path: (path.is_file(), path.name.lower()),
-    )
-    for path in paths:
+
+    # The directory entries cache the file type, so sorting and filtering them doesn't need extra stat calls
+    with os.scandir(directory) as iterator:
         # Remove hidden files
-        if path.name.startswith("."):
-            continue
+        entries = [entry for entry in iterator if not entry.name.startswith((".", "__"))]
+    # Sort dirs first then by filename
+    entries.sort(key=lambda entry: (entry.is_file(), entry.name.lower()))
+
+    for entry in entries:
+        if entry.is_dir() and (max_depth is None or max_depth > 0):
+            tree[entry.name] = walk_directory(entry.path, max_depth=None if max_depth is None else max_depth - 1)
+        elif entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+            tree["__files"].append(entry.name)
+    return tree
 
-        if path.name.startswith("__"):
-            continue
 
-        if path.is_dir():
-            tree[path.name] = walk_directory(path)
-        else:
-            if not path.name.endswith(".yaml") and not path.name.endswith(".yml"):
-                continue
-            tree["__files"] += [path.name]
+def ensure_private_directory(directory: Path, description: str) -> None:
+    """Creates the directory if needed, and checks that no other user can place files into it.
 
-    return tree
+    :param directory: Directory whose files are trusted, for example because they are unpickled
+    :param description: Description of the directory for the error messages, such as "Cache directory"
+    :raises PermissionError: If the directory is not owned by the current user or others can write to it
+    """
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    status = os.lstat(directory)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid():
+        raise PermissionError(f"{description} {directory} is not a directory owned by the current user")
+    if status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{description} {directory} is writable by other users")
@@ -0,0 +1,111 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+# Parameter Configuration
+from param_configuration.cache import environment_unchanged, resolutions_unchanged
+from param_configuration.config_layer import ConfigLayer
+from param_configuration.configuration import Configuration
+from param_configuration.resolution import Resolution, resolution_scope
+
+
+class ConfigWatcher:
+    """Keeps a configuration up to date with the files it depends on.
+
+    The watcher records all the files, config:// path resolutions, environment variables and ROS packages that the
+    resolution depended on, and polls them for changes. When a file changes, only the documents that were resolved from
+    it are parsed again, and the other documents, such as the unchanged overlays and includes, are reused. A changed
+    path resolution, environment variable or package path resolves the whole configuration again.
+    """
+
+    def __init__(self, file: Union[Path, str], config_layers: Optional[list[ConfigLayer]] = None):
+        """
+        :param file: Yaml file in string format or path to YAML file
+        :param config_layers: List of configuration layers that describe the order of overlaying different
+            YAML files. If None, uses the default layers
+        """
+        self._file = file
+        self._config_layers = config_layers if config_layers is not None else Configuration.default_layers()
+        self._resolution = Resolution()
+        self._file_signatures: dict[str, Optional[tuple[int, int]]] = {}
+        self.data: Any = None
+
+    def resolve(self) -> Any:
+        """Resolves the configuration, reusing the documents that are unaffected by the changes since the previous
+        resolution.
+
+        The configuration shares the unchanged parts with the documents kept for the next resolution, so it must not be
+        modified.
+        """
+        self._resolution.load_count = 0  # The top-level file is always parsed
+        with resolution_scope(self._resolution):
+            self.data = Configuration().load(self._file, config_layers=self._config_layers)
+        self._file_signatures = {path: file_signature(path) for path in self._resolution.dependencies.files}
+        return self.data
+
+    def changed_files(self) -> set[str]:
+        """Returns the dependency files that have been modified, created or removed since the last resolution."""
+        return {path for path, signature in self._file_signatures.items() if file_signature(path) != signature}
+
+    def poll(self) -> Optional[Any]:
+        """Resolves the configuration again if any of its dependencies have changed.
+
+        :return: The new configuration, or None if nothing has changed
+        """
+        dependencies = self._resolution.dependencies
+        if not environment_unchanged(dependencies.env, dependencies.packages) or not resolutions_unchanged(
+            [(path, names, target) for (path, names), target in dependencies.resolutions.items()],
+            self._config_layers,
+        ):
+            self._resolution = Resolution()
+            return self.resolve()
+
+        changed_files = self.changed_files()
+        if not changed_files:
+            return None
+
+        documents = self._resolution.documents
+        for key in [key for key, cached in documents.items() if cached.files & changed_files]:
+            del documents[key]
+        return self.resolve()
+
+    def watch(
+        self, callback: Callable[[Any], None], interval: float = 0.2, stop: Optional[threading.Event] = None
+    ) -> None:
+        """Resolves the configuration and calls the callback with it, and again each time the configuration changes.
+
+        :param callback: Called with the resolved configuration
+        :param interval: Seconds between the polls of the dependencies
+        :param stop: Stops watching once set. If None, watches forever.
+        """
+        stop = stop if stop is not None else threading.Event()
+        callback(self.resolve())
+        while not stop.wait(interval):
+            data = self.poll()
+            if data is not None:
+                callback(data)
+
+
+def file_signature(path: Union[str, Path]) -> Optional[tuple[int, int]]:
+    """Returns the modification time and the size of the file, or None if the file does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
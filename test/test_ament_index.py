@@ -0,0 +1,95 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the cached ament package index."""
+import os
+from pathlib import Path
+from unittest import mock
+
+# ROS
+from ament_index_python import packages
+
+# Thirdparty
+import pytest
+
+# Parameter Configuration
+from param_configuration.ament_index import PACKAGE_INDEX, get_package_share_directory
+from param_configuration.config_layers.ros_package import RosParamPackageLayer
+
+
+@pytest.fixture(name="prefixes", autouse=True)
+def fixture_prefixes(tmp_path: Path) -> list[Path]:
+    """Two install prefixes that both contain package_a, like an overlay workspace on top of an underlay."""
+    prefixes = [tmp_path / "overlay", tmp_path / "underlay"]
+    for prefix, package_names in zip(prefixes, [["package_a"], ["package_a", "package_b"]]):
+        for package_name in package_names:
+            add_package(prefix, package_name)
+
+    PACKAGE_INDEX.clear()
+    with mock.patch.dict(os.environ, {"AMENT_PREFIX_PATH": os.pathsep.join(str(prefix) for prefix in prefixes)}):
+        yield prefixes
+    PACKAGE_INDEX.clear()
+
+
+def add_package(prefix: Path, package_name: str) -> None:
+    """Registers the package in the ament resource index of the prefix."""
+    marker = prefix / "share" / "ament_index" / "resource_index" / "packages" / package_name
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+
+
+def test_package_share_directory(prefixes: list[Path]) -> None:
+    """Packages are found from the first prefix that has them, like with ament_index_python."""
+    assert get_package_share_directory("package_a") == str(prefixes[0] / "share" / "package_a")
+    assert get_package_share_directory("package_b") == str(prefixes[1] / "share" / "package_b")
+    assert get_package_share_directory("package_b") == packages.get_package_share_directory("package_b")
+    with pytest.raises(packages.PackageNotFoundError):
+        get_package_share_directory("package_c")
+
+
+def test_index_read_once(prefixes: list[Path]) -> None:
+    """The index is read once, and again only when AMENT_PREFIX_PATH changes or the index is cleared."""
+    with mock.patch.object(
+        packages, "get_packages_with_prefixes", wraps=packages.get_packages_with_prefixes
+    ) as get_packages:
+        for package_name in ["package_a", "package_b", "package_a"]:
+            get_package_share_directory(package_name)
+        assert get_packages.call_count == 1
+
+        with mock.patch.dict(os.environ, {"AMENT_PREFIX_PATH": str(prefixes[1])}):
+            assert get_package_share_directory("package_a") == str(prefixes[1] / "share" / "package_a")
+        assert get_packages.call_count == 2
+
+        add_package(prefixes[1], "package_c")
+        PACKAGE_INDEX.clear()
+        assert get_package_share_directory("package_c") == str(prefixes[1] / "share" / "package_c")
+
+
+def test_ros_layer_files(prefixes: list[Path]) -> None:
+    """The ROS layer lists the parameter files of the packages that have a params directory."""
+    params_directory = prefixes[0] / "share" / "package_a" / "params"
+    (params_directory / "nested").mkdir(parents=True)
+    (params_directory / "params.yaml").write_text("param: 1\n")
+    (params_directory / "nested" / "nested_params.yaml").write_text("param: 2\n")
+
+    assert RosParamPackageLayer().get_files() == {
+        "__files": [],
+        "package_a": {"__files": ["params.yaml"], "nested": {"__files": ["nested_params.yaml"]}},
+    }
+    assert RosParamPackageLayer().get_files(package="package_a", max_depth=1) == {
+        "__files": [],
+        "package_a": {"__files": ["params.yaml"]},
+    }
+    assert RosParamPackageLayer().get_files(package="package_b") == {"__files": []}
@@ -0,0 +1,98 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the configuration layers that read the files from zip and tar archives."""
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+# Thirdparty
+import pytest
+
+# Parameter Configuration
+from param_configuration.config_layers.archive_layer import ArchiveLayer
+from param_configuration.configuration import Configuration
+from param_configuration.path_resolver import PathResolver
+
+FILES = {
+    "device/pkg/params.yaml": "!overlay\nnode:\n  a: device\n",
+    "model/pkg/params.yaml": "node:\n  a: model\n  b: model\n",
+    "model/pkg/nested/other.yml": "c: 1\n",
+    "model/readme.txt": "Not a parameter file",
+}
+
+
+def write_archive(path: Path, files: dict[str, str]) -> Path:
+    """Writes the files into a zip or tar archive, depending on the suffix."""
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path, "w") as archive:
+            for index, (name, contents) in enumerate(files.items()):
+                # Some of the members are stored and some compressed with different methods
+                compress_type = [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2][index % 3]
+                archive.writestr(name, contents, compress_type=compress_type)
+    else:
+        with tarfile.open(path, "w:gz" if path.name.endswith(".tar.gz") else "w") as archive:
+            for name, contents in files.items():
+                info = tarfile.TarInfo(f"./{name}")
+                info.size = len(contents.encode())
+                archive.addfile(info, io.BytesIO(contents.encode()))
+    return path
+
+
+@pytest.mark.parametrize("archive_name", ["bundle.zip", "bundle.tar", "bundle.tar.gz"])
+def test_archive_layer(tmp_path: Path, archive_name: str) -> None:
+    """The files are read and listed straight from the archive."""
+    archive = write_archive(tmp_path / archive_name, FILES)
+    layer = ArchiveLayer(archive, layer_folder="model")
+
+    assert layer.name == "model"
+    assert layer.load("config://pkg/params.yaml") == FILES["model/pkg/params.yaml"]
+    assert layer.load("config://pkg/nested/other.yml") == FILES["model/pkg/nested/other.yml"]
+    assert layer.load("config://readme.txt") == FILES["model/readme.txt"]
+    assert layer.load("config://pkg/missing.yaml") is None
+    assert layer.load("config://../device/pkg/params.yaml") is None
+    assert layer.get_files() == {
+        "__files": [],
+        "pkg": {"__files": ["params.yaml"], "nested": {"__files": ["other.yml"]}},
+    }
+    assert layer.get_files(package="pkg", max_depth=1) == {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+
+
+def test_archive_as_config_directory(tmp_path: Path) -> None:
+    """An archive in PARAM_CONFIG_DIR is used in place of the config directory, and read again when it changes."""
+    archive = write_archive(tmp_path / "bundle.zip", FILES)
+
+    with mock.patch.dict(os.environ, {"PARAM_CONFIG_DIR": str(archive)}):
+        assert [layer.name for layer in PathResolver().get_layers()] == ["device", "model", "ros"]
+        assert Configuration().load("config://pkg/params.yaml") == {"node": {"a": "device", "b": "model"}}
+
+        # A new bundle is deployed by replacing the archive
+        files = {**FILES, "device/pkg/params.yaml": "!overlay\nnode:\n  b: device\n"}
+        os.replace(write_archive(tmp_path / "new_bundle.zip", files), archive)
+        assert Configuration().load("config://pkg/params.yaml") == {"node": {"a": "model", "b": "device"}}
+
+
+def test_empty_archive_member(tmp_path: Path) -> None:
+    """An empty file in the archive loads as None, like the same file in a config directory."""
+    files = {**FILES, "model/pkg/empty.yaml": ""}
+    (tmp_path / "config" / "model" / "pkg").mkdir(parents=True)
+    (tmp_path / "config" / "model" / "pkg" / "empty.yaml").write_text("", encoding="utf-8")
+
+    for config_dir in [write_archive(tmp_path / "bundle.zip", files), tmp_path / "config"]:
+        with mock.patch.dict(os.environ, {"PARAM_CONFIG_DIR": str(config_dir)}):
+            assert Configuration().load("config://pkg/empty.yaml") is None
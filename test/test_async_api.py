@@ -0,0 +1,96 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the asyncio API."""
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# Thirdparty
+import yaml
+
+# Parameter Configuration
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.configuration import Configuration, aget_resolved_yaml
+
+
+class SlowLayer(FileLocationLayer):  # pylint: disable=too-few-public-methods
+    """File layer that takes a while to look up the files, and records how many lookups run at the same time."""
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def load(self, path):
+        """Looks up the file after a delay."""
+        with self.lock:
+            SlowLayer.running += 1
+            SlowLayer.max_running = max(SlowLayer.max_running, SlowLayer.running)
+        time.sleep(0.05)
+        with self.lock:
+            SlowLayer.running -= 1
+        return super().load(path)
+
+
+def test_aload(tmp_path: Path) -> None:
+    """aload gives the same result as load, and doesn't block the event loop while the file is resolved."""
+    main = tmp_path / "main.yaml"
+    main.write_text("value: !eval 2 * 3\n")
+    (tmp_path / "model").mkdir()
+    (tmp_path / "model" / "params.yaml").write_text(f"main: !include {main}\n")
+    layers = [SlowLayer(layer_folder="model", config_directory=tmp_path)]
+
+    async def resolve_and_tick() -> tuple:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(tick())
+        data = await Configuration().aload("config://params.yaml", config_layers=layers)
+        ticker.cancel()
+        return data, ticks
+
+    data, ticks = asyncio.run(resolve_and_tick())
+    assert data == Configuration().load("config://params.yaml", config_layers=layers) == {"main": {"value": 6}}
+    assert ticks > 5
+
+
+def test_aget_resolved_yaml_concurrency(tmp_path: Path) -> None:
+    """The configurations of many devices are resolved concurrently, at most PARAM_ASYNC_CONCURRENCY at a time."""
+    (tmp_path / "model").mkdir()
+    (tmp_path / "model" / "params.yaml").write_text("value: 0\nname: model\n")
+    for device in range(6):
+        (tmp_path / f"robot_{device}").mkdir()
+        (tmp_path / f"robot_{device}" / "params.yaml").write_text(f"!overlay\nvalue: {device}\n")
+
+    async def render() -> list[str]:
+        model = FileLocationLayer(layer_folder="model", config_directory=tmp_path)
+        layers = [[SlowLayer(layer_folder=f"robot_{device}", config_directory=tmp_path), model] for device in range(6)]
+        return await asyncio.gather(*[aget_resolved_yaml("config://params.yaml", each) for each in layers])
+
+    SlowLayer.max_running = 0
+    with mock.patch.dict(os.environ, {"PARAM_ASYNC_CONCURRENCY": "2"}):
+        resolved = asyncio.run(render())
+    assert [yaml.safe_load(Path(path).read_text(encoding="utf-8")) for path in resolved] == [
+        {"value": device, "name": "model"} for device in range(6)
+    ]
+    assert SlowLayer.max_running == 2
@@ -0,0 +1,29 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Smoke tests that keep the benchmark suite runnable."""
+from pathlib import Path
+
+# Thirdparty
+import pytest
+
+from benchmarks.suite import BENCHMARKS
+
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_benchmark_runs(name: str, tmp_path: Path) -> None:
+    """Every benchmark builds its configuration tree and runs its operation."""
+    operation = BENCHMARKS[name](tmp_path, 1)
+    operation()
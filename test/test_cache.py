@@ -0,0 +1,137 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the persistent resolved configuration cache."""
+import os
+from pathlib import Path
+from unittest import mock
+
+# Thirdparty
+import pytest
+
+# Parameter Configuration
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.configuration import Configuration, get_resolved_yaml
+
+
+@pytest.fixture(name="cache_dir", autouse=True)
+def fixture_cache_dir(tmp_path: Path) -> Path:
+    """Enables the cache for the test."""
+    cache_dir = tmp_path / "cache"
+    with mock.patch.dict(os.environ, {"PARAM_CACHE_DIR": str(cache_dir)}):
+        yield cache_dir
+
+
+def layers(config_dir: Path) -> list:
+    """Device and model file layers without the ROS layer."""
+    return [
+        FileLocationLayer(layer_folder="device", config_directory=config_dir),
+        FileLocationLayer(layer_folder="model", config_directory=config_dir),
+    ]
+
+
+def test_cache_hit_does_not_parse(tmp_path: Path, cache_dir: Path) -> None:
+    """A second load of an unchanged file is returned from the cache without parsing."""
+    included = tmp_path / "included.yaml"
+    included.write_text("var_1: 1\n")
+    main = tmp_path / "main.yaml"
+    main.write_text(f"included: !include {included}\nvalue: !eval 1 + 1\n")
+
+    data = Configuration().load(main)
+    assert list(cache_dir.glob("*.pickle"))
+
+    with mock.patch.object(Configuration, "_load", side_effect=AssertionError("Should not be parsed")):
+        assert Configuration().load(main) == data == {"included": {"var_1": 1}, "value": 2}
+
+
+def test_cache_invalidated_by_changed_include(tmp_path: Path) -> None:
+    """Changing a file included by the resolved file invalidates the entry."""
+    included = tmp_path / "included.yaml"
+    included.write_text("var_1: 1\n")
+    main = tmp_path / "main.yaml"
+    main.write_text(f"from_included: !from {included} var_1\n")
+
+    assert Configuration().load(main) == {"from_included": 1}
+    included.write_text("var_1: 2\n")
+    assert Configuration().load(main) == {"from_included": 2}
+
+
+def test_cache_invalidated_by_env_variable(tmp_path: Path) -> None:
+    """Changing an environment variable read by !eval invalidates the entry."""
+    main = tmp_path / "main.yaml"
+    main.write_text("value: !eval env.CACHE_TEST_VAR\n")
+
+    with mock.patch.dict(os.environ, {"CACHE_TEST_VAR": "first"}):
+        assert Configuration().load(main) == {"value": "first"}
+    with mock.patch.dict(os.environ, {"CACHE_TEST_VAR": "second"}):
+        assert Configuration().load(main) == {"value": "second"}
+
+
+def test_cache_invalidated_by_new_overlay_file(tmp_path: Path) -> None:
+    """Adding a file to an upper layer changes the path resolution and invalidates the entry."""
+    (tmp_path / "model").mkdir()
+    (tmp_path / "device").mkdir()
+    (tmp_path / "model" / "params.yaml").write_text("var_1: model\nvar_2: model\n")
+
+    assert Configuration().load("config://params.yaml", config_layers=layers(tmp_path)) == {
+        "var_1": "model",
+        "var_2": "model",
+    }
+
+    (tmp_path / "device" / "params.yaml").write_text("!overlay\nvar_1: device\n")
+    assert Configuration().load("config://params.yaml", config_layers=layers(tmp_path)) == {
+        "var_1": "device",
+        "var_2": "model",
+    }
+
+
+def test_get_resolved_yaml_cache_hit(tmp_path: Path) -> None:
+    """get_resolved_yaml neither parses nor dumps the YAML on a cache hit."""
+    main = tmp_path / "main.yaml"
+    main.write_text("value: !eval 2 * 2\n")
+
+    first = Path(get_resolved_yaml(str(main))).read_text(encoding="utf-8")
+    with mock.patch.object(Configuration, "dump", side_effect=AssertionError("Should not be dumped")):
+        second = Path(get_resolved_yaml(str(main))).read_text(encoding="utf-8")
+    assert first == second
+    assert "value: 4" in second
+
+
+def test_load_many_uses_cache_per_file(tmp_path: Path) -> None:
+    """Files of a batch that are already in the cache are not resolved again."""
+    first = tmp_path / "first.yaml"
+    first.write_text("value: 1\n")
+    second = tmp_path / "second.yaml"
+    second.write_text("value: 2\n")
+    Configuration().load(first)
+
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        assert Configuration().load_many([first, second]) == [{"value": 1}, {"value": 2}]
+        assert parse.call_count == 1
+        assert Configuration().load_many([first, second]) == [{"value": 1}, {"value": 2}]
+        assert parse.call_count == 1
+
+
+def test_cache_directory_writable_by_others_is_refused(tmp_path: Path, cache_dir: Path) -> None:
+    """The cache entries are unpickled, so a directory where other users could place entries is not used."""
+    main = tmp_path / "main.yaml"
+    main.write_text("value: 1\n", encoding="utf-8")
+    Configuration().load(main)
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+
+    cache_dir.chmod(0o777)
+    with pytest.raises(PermissionError):
+        Configuration().load(main)
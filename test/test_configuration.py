@@ -14,16 +14,26 @@
 #   limitations under the License.
 #  ------------------------------------------------------------------
 import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest import mock
 
 # Thirdparty
 import pytest
+import ruamel.yaml
 import yaml
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.constructor import RoundTripConstructor
 from simpleeval import AttributeDoesNotExist
 
 # Parameter Configuration
-from param_configuration.configuration import Configuration
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.configuration import Configuration, get_resolved_yamls
+from param_configuration.path_resolver import PathResolver
+from param_configuration.resolution import Resolution, resolution_scope
+from param_configuration.tags.eval import compile_expression
 from param_configuration.temp_config_env import TempConfigEnv
 
 
@@ -110,6 +120,17 @@ def test_eval_to_string() -> None:
     assert data_str == expected_string
 
 
+def test_eval_expression_compiled_once() -> None:
+    """Identical !eval expressions are parsed only once."""
+    compile_expression.cache_clear()
+    data = Configuration().load("a: !eval 2 * 21\nb: !eval 2 * 21\nc: !eval 2 * 21")
+    assert data == {"a": 42, "b": 42, "c": 42}
+
+    cache_info = compile_expression.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 2
+
+
 def test_eval_small_numbers() -> None:
     """Test the loading and dumping !eval directive from a string."""
     configuration = Configuration()
@@ -127,6 +148,33 @@ def test_eval_small_numbers() -> None:
     assert data_str == expected_str
 
 
+def test_loader_keeps_ruamel_defaults() -> None:
+    """Loading registers the tags only to the configuration loaders, not globally to ruamel."""
+    data = Configuration().load("value: !eval 1 + 1\nfloat: 1.5")
+    assert data == {"value": 2, "float": 1.5}
+
+    assert "!eval" not in RoundTripConstructor.yaml_constructors
+    assert type(ruamel.yaml.YAML().load("float: 1.5")["float"]) is not float  # pylint: disable=unidiomatic-typecheck
+
+
+def test_tag_free_file_uses_safe_loader(tmp_path: Path) -> None:
+    """Files without tags are loaded into plain types, unless the comments are preserved."""
+    plain = tmp_path / "plain.yaml"
+    plain.write_text("# Comment\nnested:\n  list: [1, 2.5, no]\n")
+    main = tmp_path / "main.yaml"
+    main.write_text(f"included: !include {plain}\n")
+
+    data = Configuration().load(main)
+    assert data == {"included": {"nested": {"list": [1, 2.5, "no"]}}}
+    assert type(data["included"]) is dict  # pylint: disable=unidiomatic-typecheck
+    assert isinstance(data, CommentedMap)
+
+    with resolution_scope(Resolution(preserve_comments=True)):
+        data = Configuration().load(plain)
+    assert isinstance(data, CommentedMap)
+    assert Configuration().dump(data).startswith("# Comment")
+
+
 def test_eval_tag_from_file(tmp_path: Path, yaml_string: str) -> None:
     """Test the !eval directive from a file."""
     test_file = tmp_path / "test_file.yaml"
@@ -170,8 +218,6 @@ def test_eval_variables() -> None:
     assert data == {"other_vars": [{"var_3": "abc"}], "eval_1": 2, "eval_2": [3, 2, 37], "eval_3": 3}
 
 
-# TODO Multiple nested variables are not yet supported
-@pytest.mark.skip(reason="Known issue")
 def test_eval_variables_multiple_levels() -> None:
     """Test loading multiple-levelled nested variables."""
     yaml_data = """
@@ -179,12 +225,43 @@ def test_eval_variables_multiple_levels() -> None:
     - var_1: 1
     - var_2: !eval var.var_1 + 1
     - var_3: !eval var.var_2 + 1
-    eval_1: !eval var.var_2
+    eval_1: !eval var.var_3
     """
     data = Configuration().load(yaml_data)
     assert data == {"eval_1": 3}
 
 
+def test_eval_variables_any_order() -> None:
+    """Variables can refer to the variables defined after them."""
+    yaml_data = """
+    eval_1: !eval var.var_1
+    .variables:
+    - var_1: !eval var.var_2 * 2
+    - var_2: 3
+    """
+    data = Configuration().load(yaml_data)
+    assert data == {"eval_1": 6}
+
+
+def test_eval_variables_scale_linearly() -> None:
+    """The variables are resolved once per document instead of once per !eval tag."""
+
+    def count_constructed_objects(size: int) -> int:
+        yaml_data = ".variables:\n"
+        yaml_data += "".join(f"- var_{i}: {i}\n" for i in range(size))
+        yaml_data += "".join(f"eval_{i}: !eval var.var_{i}\n" for i in range(size))
+        with mock.patch.object(
+            RoundTripConstructor,
+            "construct_object",
+            autospec=True,
+            side_effect=RoundTripConstructor.construct_object,
+        ) as construct_object:
+            Configuration().load(yaml_data)
+        return construct_object.call_count
+
+    assert count_constructed_objects(200) <= 2.2 * count_constructed_objects(100)
+
+
 def test_eval_non_existing_var() -> None:
     """If the !eval tag is used with a parameter that does not exist, should raise an error."""
     yaml_data = """
@@ -331,6 +408,85 @@ def test_from_tag(tmp_path: Path) -> None:
     assert data == {"from_other_file": 1, "from_other_file_2": 2}
 
 
+def test_shared_file_parsed_once(tmp_path: Path) -> None:
+    """Each file is parsed only once per resolution, even if it is referenced by many tags."""
+    shared_file = tmp_path / "shared.yaml"
+    shared_file.write_text("var_1: 1\nnested:\n    var_2: 2\n")
+
+    main_file = tmp_path / "main.yaml"
+    main_file.write_text(
+        f"""
+    from_1: !from {shared_file} var_1
+    from_2: !from {shared_file} nested.var_2
+    include: !include {shared_file}
+    merged: !merge
+        - !include {shared_file}
+        - var_1: 3
+    """
+    )
+
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        data = Configuration().load(main_file)
+        assert parse.call_count == 2
+
+    # Modifying the merged copy must not affect the other users of the same file
+    assert data == {
+        "from_1": 1,
+        "from_2": 2,
+        "include": {"var_1": 1, "nested": {"var_2": 2}},
+        "merged": {"var_1": 3, "nested": {"var_2": 2}},
+    }
+
+
+def test_load_many_shares_files(tmp_path: Path) -> None:
+    """Files included by several configurations of a batch are parsed only once."""
+    shared_file = tmp_path / "shared.yaml"
+    shared_file.write_text("var_1: 1\n")
+    files = []
+    for index in range(3):
+        files.append(tmp_path / f"main_{index}.yaml")
+        files[-1].write_text(f"include: !include {shared_file}\nindex: {index}\n")
+
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        data = Configuration().load_many(files)
+        assert parse.call_count == 4
+
+    assert data == [{"include": {"var_1": 1}, "index": index} for index in range(3)]
+    data[0]["include"]["var_1"] = 2
+    assert data[1]["include"]["var_1"] == 1
+
+
+def test_load_with_dependencies(tmp_path: Path) -> None:
+    """The dependency graph records the overlays, the tags that loaded the files and the environment variables."""
+    (tmp_path / "device").mkdir()
+    (tmp_path / "model").mkdir()
+    included = tmp_path / "included.yaml"
+    included.write_text("var_1: !eval env.DEPS_TEST_VAR\n")
+    (tmp_path / "device" / "params.yaml").write_text(f"!overlay\nincluded: !include {included}\n")
+    (tmp_path / "model" / "params.yaml").write_text("var_2: 2\n")
+    layers = [
+        FileLocationLayer(layer_folder="device", config_directory=tmp_path),
+        FileLocationLayer(layer_folder="model", config_directory=tmp_path),
+    ]
+
+    with mock.patch.dict(os.environ, {"DEPS_TEST_VAR": "value"}):
+        data, graph = Configuration().load_with_dependencies("config://params.yaml", config_layers=layers)
+
+    assert data == {"var_2": 2, "included": {"var_1": "value"}}
+    assert graph.roots() == ["config://params.yaml (device, model)"]
+    assert graph.edges == {
+        ("config://params.yaml (device, model)", str(tmp_path / "device" / "params.yaml")): "resolves",
+        ("config://params.yaml (device, model)", "config://params.yaml (model)"): "!overlay",
+        ("config://params.yaml (device, model)", str(included)): "!include",
+        ("config://params.yaml (model)", str(tmp_path / "model" / "params.yaml")): "resolves",
+        (str(included), "env:DEPS_TEST_VAR"): "!eval",
+    }
+    assert graph.nodes["env:DEPS_TEST_VAR"] == {"kind": "env", "value": "value"}
+    assert '"config://params.yaml (device, model)" -> "config://params.yaml (model)"' in graph.to_dot()
+
+
 def test_merge_tag_from_string(tmp_path: Path) -> None:
     """Test merge from a string."""
     yaml_data = """
@@ -517,6 +673,30 @@ var3: "package_level_var3"
             }
 
 
+@mock.patch.dict(os.environ, {"PARAM_LAYERS": "device, hardware, customer, site, model"})
+def test_overlay_deep_layer_stack(tmp_path: Path) -> None:
+    """The layers of PARAM_LAYERS are overlaid in order, skipping the layers that don't have the file, and each
+    document is parsed only once."""
+    write_to_file_config_layer("!overlay\nnode:\n  a: device\n", "device", "pkg", "params.yaml", tmp_path)
+    write_to_file_config_layer(
+        "!overlay\nnode:\n  a: hardware\n  b: hardware\n", "hardware", "pkg", "params.yaml", tmp_path
+    )
+    write_to_file_config_layer(
+        "!overlay\n.variables:\n  - site: 2\nnode:\n  c: !eval var.site * 2\n", "site", "pkg", "params.yaml", tmp_path
+    )
+    write_to_file_config_layer("node:\n  a: 0\n  b: 0\n  c: 0\n  d: 0\n", "model", "pkg", "params.yaml", tmp_path)
+
+    with TempConfigEnv(path=tmp_path), mock.patch.object(
+        Configuration, "_parse", autospec=True, side_effect=Configuration._parse  # pylint: disable=protected-access
+    ) as parse:
+        layer_names = [layer.name for layer in PathResolver().get_layers()]
+        assert layer_names == ["device", "hardware", "customer", "site", "model", "ros"]
+        assert Configuration().load("config://pkg/params.yaml") == {
+            "node": {"a": "device", "b": "hardware", "c": 4, "d": 0}
+        }
+        assert parse.call_count == 4
+
+
 @mock.patch.dict(os.environ, {"PARAM_DEVICE_DIR": "device"})
 def test_nested_tags(tmp_path: Path) -> None:
     """Test nested tags."""
@@ -551,3 +731,71 @@ var3: "package_level_var3"
             configuration = Configuration()
             data = configuration.load(f"config://{package_name}/{test_file_1}")
             assert data == {"from": "package_level_var3", "include": {"var3": "package_level_var3"}}
+
+
+def test_nested_tag_uses_document_variables(tmp_path: Path) -> None:
+    """Nested tags are evaluated within the same document, without loading it again."""
+    other_file = tmp_path / "other.yaml"
+    other_file.write_text("key: 1\n")
+
+    yaml_data = f"""
+    .variables:
+    - other_file: {other_file}
+    value: !from '!eval var.other_file + " key"'
+    """
+
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        data = Configuration().load(yaml_data)
+        assert parse.call_count == 2  # The document itself and the other file
+
+    assert data == {"value": 1}
+
+
+def test_get_resolved_yamls(tmp_path: Path) -> None:
+    """get_resolved_yamls returns the resolved files in the order of the given paths."""
+    files = []
+    for index in range(2):
+        files.append(tmp_path / f"main_{index}.yaml")
+        files[-1].write_text(f"value: !eval {index} + 1\n")
+
+    resolved = get_resolved_yamls([str(file) for file in files])
+    assert [yaml.safe_load(Path(path).read_text(encoding="utf-8")) for path in resolved] == [{"value": 1}, {"value": 2}]
+
+
+def test_load_many_in_threads(tmp_path: Path) -> None:
+    """Files resolved concurrently in threads give the same results as sequentially resolved ones."""
+    shared_file = tmp_path / "shared.yaml"
+    shared_file.write_text(".variables:\n- scale: 2\nvalue: !eval var.scale * 3\n")
+    files = []
+    for index in range(20):
+        files.append(tmp_path / f"main_{index}.yaml")
+        files[-1].write_text(
+            f".variables:\n- index: {index}\nindex: !eval var.index * 2\nshared: !include {shared_file}\n"
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        data = Configuration().load_many(files, executor=executor)
+    assert data == Configuration().load_many(files)
+    assert data[5] == {"index": 10, "shared": {"value": 6}}
+
+
+def test_get_resolved_yamls_in_processes(tmp_path: Path) -> None:
+    """get_resolved_yamls keeps the order of the paths when the files are resolved in parallel processes."""
+    files = []
+    for index in range(4):
+        files.append(tmp_path / f"main_{index}.yaml")
+        files[-1].write_text(f"value: !eval {index} * 2\n")
+
+    resolved = get_resolved_yamls([str(file) for file in files], workers=2)
+    assert [yaml.safe_load(Path(path).read_text(encoding="utf-8")) for path in resolved] == [
+        {"value": 2 * i} for i in range(4)
+    ]
+
+
+def test_import_does_not_load_heavy_modules() -> None:
+    """numpy, simpleeval, ament_index_python and asyncio are imported only when a configuration needs them."""
+    heavy_modules = "{'numpy', 'simpleeval', 'ament_index_python', 'asyncio'}"
+    code = f"import sys, param_configuration; print(sorted({heavy_modules} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,83 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for resolving the configurations of many devices at once."""
+from pathlib import Path
+from unittest import mock
+
+# Thirdparty
+import pytest
+import yaml
+
+# Parameter Configuration
+from param_configuration.configuration import Configuration
+from param_configuration.fleet import FleetRenderer
+from param_configuration.snapshot import read_snapshot
+
+
+@pytest.fixture(name="config_dir")
+def fixture_config_dir(tmp_path: Path) -> Path:
+    """Config directory with a model and three devices, two of which override the parameters."""
+    config_dir = tmp_path / "config"
+    for folder in ["model", "devices/robot_1", "devices/robot_2", "devices/robot_3"]:
+        (config_dir / folder).mkdir(parents=True)
+
+    (config_dir / "model" / "params.yaml").write_text("common: !include config://common.yaml\nvalue: model\n")
+    (config_dir / "model" / "common.yaml").write_text("name: model\n")
+    (config_dir / "devices" / "robot_1" / "params.yaml").write_text("!overlay\nvalue: robot_1\n")
+    (config_dir / "devices" / "robot_1" / "common.yaml").write_text("!overlay\nname: robot_1\n")
+    (config_dir / "devices" / "robot_2" / "params.yaml").write_text("!overlay\nvalue: robot_2\n")
+    return config_dir
+
+
+def rendered(output_dir: Path, device: str) -> dict:
+    """Reads the rendered params.yaml of the device."""
+    return yaml.safe_load((output_dir / "devices" / device / "params.yaml").read_text())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_fleet(config_dir: Path, tmp_path: Path, workers: int) -> None:
+    """Each device gets its own resolved file, and the includes use the layers of the device."""
+    renderer = FleetRenderer(config_directory=config_dir, output_directory=tmp_path / "out")
+    devices = renderer.find_devices(["devices/*"])
+    assert devices == ["devices/robot_1", "devices/robot_2", "devices/robot_3"]
+
+    written = renderer.render(["config://params.yaml"], devices, workers=workers)
+    assert len(written) == 3
+    assert rendered(tmp_path / "out", "robot_1") == {"common": {"name": "robot_1"}, "value": "robot_1"}
+    assert rendered(tmp_path / "out", "robot_2") == {"common": {"name": "model"}, "value": "robot_2"}
+    assert rendered(tmp_path / "out", "robot_3") == {"common": {"name": "model"}, "value": "model"}
+
+
+def test_render_fleet_shares_model_files(config_dir: Path, tmp_path: Path) -> None:
+    """The model files that don't depend on the device are parsed only once for the whole fleet."""
+    (config_dir / "model" / "static.yaml").write_text("value: model\n")
+    for device in ["robot_1", "robot_2", "robot_3"]:
+        (config_dir / "devices" / device / "static.yaml").write_text(f"!overlay\ndevice: {device}\n")
+
+    renderer = FleetRenderer(config_directory=config_dir, output_directory=tmp_path / "out")
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        renderer.render(["config://static.yaml"], renderer.find_devices(["devices/*"]))
+        assert parse.call_count == 4
+
+
+def test_render_fleet_snapshots(config_dir: Path, tmp_path: Path) -> None:
+    """Snapshots contain the same configuration as the rendered YAML files."""
+    renderer = FleetRenderer(config_directory=config_dir, output_directory=tmp_path / "out")
+    written = renderer.render(["config://params.yaml"], ["devices/robot_1"], snapshot=True)
+
+    assert written == [tmp_path / "out" / "devices" / "robot_1" / "params.pcsnap"]
+    assert read_snapshot(written[0]) == {"common": {"name": "robot_1"}, "value": "robot_1"}
@@ -0,0 +1,105 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the in-memory indexes of the layer folders."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+# Parameter Configuration
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.layer_index import LayerIndex
+from param_configuration.utils import walk_directory
+
+
+def test_index_lookups(tmp_path: Path) -> None:
+    """Lookups are answered from a single scan, and paths outside the folder are left to the file system."""
+    (tmp_path / "pkg" / "nested").mkdir(parents=True)
+    (tmp_path / "pkg" / "params.yaml").write_text("a: 1\n")
+    (tmp_path / "pkg" / "nested" / "params.yaml").write_text("a: 1\n")
+
+    index = LayerIndex(str(tmp_path), refresh_interval=60)
+    assert index.contains("//pkg/params.yaml")
+    with mock.patch("os.stat", side_effect=AssertionError("Should not touch the file system")):
+        assert index.contains("pkg/nested/params.yaml")
+        assert not index.contains("pkg/missing.yaml")
+        assert not index.contains("pkg/nested")
+    assert index.contains("../outside.yaml") is None
+
+
+def test_index_notices_new_files(tmp_path: Path) -> None:
+    """A new file changes the modification time of its folder, which triggers a new scan."""
+    (tmp_path / "pkg").mkdir()
+    index = LayerIndex(str(tmp_path))
+    assert not index.contains("pkg/params.yaml")
+
+    (tmp_path / "pkg" / "params.yaml").write_text("a: 1\n")
+    os.utime(tmp_path / "pkg", ns=(0, 0))  # The modification time might not change within the timestamp resolution
+    assert index.contains("pkg/params.yaml")
+
+
+def test_index_tree_matches_walk_directory() -> None:
+    """The tree built from the index is the same as walking the folder."""
+    config_dir = Path(__file__).parent / "test_config"
+    assert LayerIndex(str(config_dir)).tree() == walk_directory(config_dir)
+
+
+def test_file_location_layer_with_index(tmp_path: Path) -> None:
+    """The layer resolves the same paths with and without the index."""
+    (tmp_path / "model" / "pkg").mkdir(parents=True)
+    (tmp_path / "model" / "pkg" / "params.yaml").write_text("a: 1\n")
+
+    for index_interval in [None, 1.0]:
+        layer = FileLocationLayer(layer_folder="model", config_directory=tmp_path, index_interval=index_interval)
+        assert layer.load("config://pkg/params.yaml") == tmp_path / "model" / "pkg" / "params.yaml"
+        assert layer.load("config://pkg/missing.yaml") is None
+        assert layer.get_files() == {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+
+
+def test_file_location_layer_with_index_in_process_pool(tmp_path: Path) -> None:
+    """A layer with an index can be passed to other processes, which build their own index."""
+    (tmp_path / "model" / "pkg").mkdir(parents=True)
+    params = tmp_path / "model" / "pkg" / "params.yaml"
+    params.write_text("a: 1\n", encoding="utf-8")
+    layer = FileLocationLayer(layer_folder="model", config_directory=tmp_path, index_interval=1.0)
+    assert layer.load("config://pkg/params.yaml") == params  # Builds the index in this process
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(layer.load, "config://pkg/params.yaml").result() == params
+        assert executor.submit(layer.get_files).result() == {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+
+
+def test_file_location_layer_filters(tmp_path: Path) -> None:
+    """The package and depth filters give the same results with and without the index."""
+    (tmp_path / "model" / "pkg" / "nested").mkdir(parents=True)
+    (tmp_path / "model" / "other").mkdir()
+    (tmp_path / "model" / "pkg" / "params.yaml").write_text("a: 1\n")
+    (tmp_path / "model" / "pkg" / "nested" / "params.yaml").write_text("a: 1\n")
+    (tmp_path / "model" / "other" / "params.yaml").write_text("a: 1\n")
+
+    for index_interval in [None, 1.0]:
+        layer = FileLocationLayer(layer_folder="model", config_directory=tmp_path, index_interval=index_interval)
+        assert layer.get_files(package="pkg") == {
+            "__files": [],
+            "pkg": {"__files": ["params.yaml"], "nested": {"__files": ["params.yaml"]}},
+        }
+        assert layer.get_files(package="pkg", max_depth=1) == {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+        assert layer.get_files(package="missing") == {"__files": []}
+        assert layer.get_files(max_depth=1) == {
+            "__files": [],
+            "other": {"__files": ["params.yaml"]},
+            "pkg": {"__files": ["params.yaml"]},
+        }
@@ -0,0 +1,112 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the managed directory of the resolved YAML files."""
+import os
+import time
+from pathlib import Path
+from unittest import mock
+
+# Thirdparty
+import pytest
+
+# Parameter Configuration
+from param_configuration.configuration import get_resolved_yaml
+from param_configuration.output_directory import ResolvedOutputDirectory
+
+
+def test_identical_contents_reuse_file(tmp_path: Path) -> None:
+    """The same contents are written only once, and reusing the file marks it as recently used."""
+    output = ResolvedOutputDirectory(tmp_path)
+    first = output.write("value: 1\n")
+    os.utime(first, (0, 0))
+
+    with mock.patch("tempfile.NamedTemporaryFile", side_effect=AssertionError("Should not be written")):
+        assert output.write("value: 1\n") == first
+    assert os.stat(first).st_mtime > 0
+    assert output.write("value: 2\n") != first
+    assert sorted(path.read_text(encoding="utf-8") for path in tmp_path.iterdir()) == ["value: 1\n", "value: 2\n"]
+
+
+def test_evict_old_files(tmp_path: Path) -> None:
+    """Files that have not been used within the maximum age are removed when a new file is written."""
+    output = ResolvedOutputDirectory(tmp_path, max_age=60)
+    old = output.write("value: 1\n")
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    recent = output.write("value: 2\n")
+
+    output.write("value: 3\n")
+    assert not old.exists()
+    assert recent.exists()
+
+
+def test_evict_least_recently_used_files(tmp_path: Path) -> None:
+    """The least recently used files are removed while the directory is larger than the maximum size."""
+    paths = []
+    for index in range(3):
+        paths.append(ResolvedOutputDirectory(tmp_path).write(f"value: {index}\n"))  # 9 bytes each
+        os.utime(paths[-1], (time.time() - 10 + index, time.time() - 10 + index))
+
+    output = ResolvedOutputDirectory(tmp_path, max_bytes=20)
+    output.write("value: 0\n")  # Reused, so it becomes the most recently used file
+    newest = output.write("value: 3\n")
+    assert [path.exists() for path in paths] == [True, False, False]
+    assert newest.exists()
+
+
+def test_evict_only_resolved_files(tmp_path: Path) -> None:
+    """Files that were not written by the output directory are never removed, however old they are."""
+    notes = tmp_path / "notes.txt"
+    notes.write_text("Not a resolved file\n", encoding="utf-8")
+    partial = tmp_path / ".tmpabcdef"
+    partial.write_text("value: 1\n", encoding="utf-8")
+    for path in (notes, partial):
+        os.utime(path, (0, 0))
+
+    output = ResolvedOutputDirectory(tmp_path, max_age=60, max_bytes=0)
+    written = output.write("value: 2\n")
+    assert notes.exists()
+    assert partial.exists()
+    assert written.exists()
+
+
+def test_directory_writable_by_others_is_refused(tmp_path: Path) -> None:
+    """A directory where other users could place files is not trusted, and the default directory is private."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(PermissionError):
+        ResolvedOutputDirectory(shared).write("value: 1\n")
+    assert not list(shared.iterdir())
+
+    with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": str(tmp_path)}):
+        os.environ.pop("PARAM_OUTPUT_DIR", None)
+        output = ResolvedOutputDirectory.from_env()
+    assert output.directory == tmp_path / "param_configuration"
+    output.write("value: 1\n")
+    assert output.directory.stat().st_mode & 0o777 == 0o700
+
+
+def test_get_resolved_yaml_uses_output_directory(tmp_path: Path) -> None:
+    """get_resolved_yaml writes into PARAM_OUTPUT_DIR and returns the same file for the same configuration."""
+    main = tmp_path / "main.yaml"
+    main.write_text("value: !eval 2 * 2\n", encoding="utf-8")
+
+    with mock.patch.dict(os.environ, {"PARAM_OUTPUT_DIR": str(tmp_path / "output")}):
+        first = get_resolved_yaml(str(main))
+        assert get_resolved_yaml(str(main)) == first
+
+    assert Path(first).parent == tmp_path / "output"
+    assert "value: 4" in Path(first).read_text(encoding="utf-8")
@@ -0,0 +1,64 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the resolution profiler."""
+from pathlib import Path
+
+# Parameter Configuration
+from param_configuration.configuration import Configuration
+from param_configuration.profiler import profiling
+
+
+def test_profiler_records_files_tags_and_expressions(tmp_path: Path) -> None:
+    """The profiler counts the parsed files, the constructed tags and the evaluated expressions."""
+    included = tmp_path / "included.yaml"
+    included.write_text("var_1: 1\n")
+    main = tmp_path / "main.yaml"
+    main.write_text(f"included: !include {included}\nvalue_1: !eval 1 + 1\nvalue_2: !eval 1 + 1\n")
+
+    with profiling() as profiler:
+        Configuration().load(main)
+
+    assert profiler.stats[("file", str(main))].calls == 1
+    assert profiler.stats[("file", str(included))].calls == 1
+    assert profiler.stats[("tag", "!include")].calls == 1
+    assert profiler.stats[("tag", "!eval")].calls == 2
+    assert profiler.stats[("eval", "1 + 1")].calls == 2
+
+    main_stats = profiler.stats[("file", str(main))]
+    assert main_stats.own < main_stats.total  # The included file is not counted as the own time of the main file
+    assert profiler.hot_spots()[0].own >= profiler.hot_spots()[-1].own
+    assert {each.category for each in profiler.hot_spots("tag")} == {"tag"}
+
+
+def test_profiler_chrome_trace(tmp_path: Path) -> None:
+    """Every recorded span ends up as a complete event in the Chrome trace."""
+    with profiling() as profiler:
+        Configuration().load("value: !eval 2 * 2")
+
+    trace = profiler.chrome_trace()["traceEvents"]
+    assert {(event["cat"], event["name"]) for event in trace} == set(profiler.stats)
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace)
+
+    profiler.write_chrome_trace(tmp_path / "trace.json")
+    assert (tmp_path / "trace.json").read_text().startswith('{"traceEvents"')
+
+
+def test_no_profiling_by_default() -> None:
+    """Without an active profiler, nothing is recorded."""
+    with profiling() as profiler:
+        pass
+    Configuration().load("value: !eval 2 * 2")
+    assert not profiler.stats
@@ -0,0 +1,127 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the read-through caching layer."""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+# Parameter Configuration
+from param_configuration.config_layer import ConfigLayer
+from param_configuration.config_layers.read_through_cache_layer import ReadThroughCacheLayer
+from param_configuration.configuration import Configuration
+
+
+class ServerLayer(ConfigLayer):
+    """Stand-in for a layer that fetches the files from a config server."""
+
+    def __init__(self, files: dict[str, str]):
+        """
+        :param files: Contents of the files by config:// path
+        """
+        self.files = files
+        self.online = True
+        self.requests = 0
+
+    @property
+    def name(self) -> str:
+        """Name of the layer."""
+        return "server"
+
+    def load(self, path: Union[str, Path]) -> Union[str, Path, None]:
+        """Returns the contents of the file, or fails like an unreachable server when offline.
+
+        :raises ConnectionError: If the server is offline
+        """
+        self.requests += 1
+        if not self.online:
+            raise ConnectionError("Config server is not reachable")
+        return self.files.get(str(path))
+
+    def get_files(self, package: Optional[str] = None, max_depth: Optional[int] = None) -> dict:
+        """Returns a fixed tree of files, or fails like an unreachable server when offline.
+
+        :raises ConnectionError: If the server is offline
+        """
+        del package, max_depth  # The filters are not needed by the tests
+        if not self.online:
+            raise ConnectionError("Config server is not reachable")
+        return {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+
+
+def test_copies_are_reused(tmp_path: Path) -> None:
+    """The wrapped layer is asked only once per file, also by the later processes."""
+    server = ServerLayer({"config://pkg/params.yaml": "a: 1\n"})
+    layer = ReadThroughCacheLayer(server, tmp_path / "cache")
+
+    copy = layer.load("config://pkg/params.yaml")
+    assert copy == tmp_path / "cache" / "pkg" / "params.yaml"
+    assert copy.read_text(encoding="utf-8") == "a: 1\n"
+    assert layer.load("config://pkg/params.yaml") == copy
+    assert layer.load("config://pkg/missing.yaml") is None
+    assert layer.load("config://pkg/missing.yaml") is None
+    assert server.requests == 2
+
+    assert ReadThroughCacheLayer(server, tmp_path / "cache").load("config://pkg/params.yaml") == copy
+    assert server.requests == 2
+
+
+def test_old_copies_are_refreshed(tmp_path: Path) -> None:
+    """Old copies are fetched again, and used as they are while the wrapped layer fails."""
+    server = ServerLayer({"config://pkg/params.yaml": "a: 1\n"})
+    layer = ReadThroughCacheLayer(server, tmp_path / "cache", max_age=0)
+    copy = layer.load("config://pkg/params.yaml")
+
+    server.files["config://pkg/params.yaml"] = "a: 2\n"
+    assert layer.load("config://pkg/params.yaml").read_text(encoding="utf-8") == "a: 2\n"
+
+    server.online = False
+    assert layer.load("config://pkg/params.yaml") == copy
+    assert copy.read_text(encoding="utf-8") == "a: 2\n"
+    assert layer.get_files() == {"__files": [], "pkg": {"__files": ["params.yaml"]}}
+
+    server.online = True
+    del server.files["config://pkg/params.yaml"]
+    assert layer.load("config://pkg/params.yaml") is None
+    assert not copy.exists()
+
+
+def test_unchanged_copies_are_marked_fresh(tmp_path: Path) -> None:
+    """Fetching an unchanged file again marks the copy fresh for the later processes, without rewriting it."""
+    server = ServerLayer({"config://pkg/params.yaml": "a: 1\n"})
+    copy = ReadThroughCacheLayer(server, tmp_path / "cache").load("config://pkg/params.yaml")
+    inode = copy.stat().st_ino
+    os.utime(copy, (time.time() - 120, time.time() - 120))
+
+    assert ReadThroughCacheLayer(server, tmp_path / "cache", max_age=60).load("config://pkg/params.yaml") == copy
+    assert server.requests == 2
+    assert copy.stat().st_ino == inode
+
+    assert ReadThroughCacheLayer(server, tmp_path / "cache", max_age=60).load("config://pkg/params.yaml") == copy
+    assert server.requests == 2
+
+
+def test_layer_in_process_pool(tmp_path: Path) -> None:
+    """The layer can be passed to other processes, which use the copies made by this process."""
+    server = ServerLayer({"config://pkg/params.yaml": "a: 1\n"})
+    layer = ReadThroughCacheLayer(server, tmp_path / "cache")
+    copy = layer.load("config://pkg/params.yaml")
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert executor.submit(layer.load, "config://pkg/params.yaml").result() == copy
+        data = Configuration().load_many(["config://pkg/params.yaml"] * 2, config_layers=[layer], executor=executor)
+    assert data == [{"a": 1}, {"a": 1}]
@@ -0,0 +1,84 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the binary snapshots of resolved configurations."""
+from pathlib import Path
+
+# Thirdparty
+import pytest
+
+# Parameter Configuration
+from param_configuration.configuration import Configuration
+from param_configuration.snapshot import dumps, loads, read_snapshot, write_snapshot
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    """A resolved configuration is loaded back from a snapshot with the same values and key order."""
+    main = tmp_path / "main.yaml"
+    main.write_text(
+        """
+node:
+  ros__parameters:
+    name: "robot"
+    enabled: true
+    disabled: no
+    count: 3
+    large: 18446744073709551616
+    ratio: !eval np.float64(1.5) * 2
+    radius: !eval 0.6 / 2
+    frames: [base_link, odom]
+    missing: null
+    1: integer key
+"""
+    )
+    data = Configuration().load(main)
+
+    write_snapshot(data, tmp_path / "main.pcsnap")
+    loaded = read_snapshot(tmp_path / "main.pcsnap")
+
+    assert loaded == data
+    assert list(loaded["node"]["ros__parameters"]) == list(data["node"]["ros__parameters"])
+    assert type(loaded["node"]["ros__parameters"]["ratio"]) is float  # pylint: disable=unidiomatic-typecheck
+
+
+def test_snapshot_stores_repeated_strings_once() -> None:
+    """The parameter names that repeat between the nodes are stored only once."""
+    data = {f"node_{index}": {"ros__parameters": {"use_sim_time": False}} for index in range(100)}
+    assert dumps(data).count(b"ros__parameters") == 1
+
+
+@pytest.mark.parametrize(
+    "snapshot",
+    [
+        b"",
+        b"NOTSNAP\x01\x00\x00\x00\x00N",
+        dumps({"a": 1})[:-1],
+        dumps({"a": 1}) + b"N",
+        b"PCSNAP\x63\x00\x00\x00\x00N",
+        b"PCSNAP\x01\x00\x00\x00\x00X",
+        b"PCSNAP\x01\x00\x00\x00\x00m\x01\x00\x00\x00l\x00\x00\x00\x00N",
+        b"PCSNAP\x01\x00\x00\x00\x00" + b"l\x01\x00\x00\x00" * 100_000 + b"N",
+    ],
+)
+def test_invalid_snapshot(snapshot: bytes) -> None:
+    """Truncated, corrupted and unsupported snapshots raise ValueError."""
+    with pytest.raises(ValueError):
+        loads(snapshot)
+
+
+def test_unsupported_type() -> None:
+    """Values that are not plain configuration values can't be stored."""
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
@@ -0,0 +1,76 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for the merge and directory walking helpers."""
+from pathlib import Path
+
+# Parameter Configuration
+from param_configuration.utils import merge_left, merged, walk_directory
+
+
+def test_merge_left_overwrites_in_place() -> None:
+    """b is merged into a, overwriting the values of a."""
+    keys_a = {"a": 1, "nested": {"b": 1, "c": {"d": 1}}}
+    result = merge_left(keys_a, {"nested": {"c": {"d": 2}, "e": 2}, "f": 2})
+    assert result is keys_a
+    assert keys_a == {"a": 1, "nested": {"b": 1, "c": {"d": 2}, "e": 2}, "f": 2}
+    assert merge_left({"a": 1}, {"b": 2}, path=["root"]) == {"a": 1, "b": 2}
+
+
+def test_merged_shares_untouched_subtrees() -> None:
+    """Neither input is modified, and only the mappings on the paths to the overwritten keys are copied."""
+    base = {"untouched": {"large": list(range(10))}, "nested": {"b": 1, "sibling": {"c": 1}}}
+    overlay = {"nested": {"b": 2, "new": {"d": 2}}}
+
+    result = merged(base, overlay)
+    assert result == {"untouched": {"large": list(range(10))}, "nested": {"b": 2, "sibling": {"c": 1}, "new": {"d": 2}}}
+    assert base == {"untouched": {"large": list(range(10))}, "nested": {"b": 1, "sibling": {"c": 1}}}
+    assert overlay == {"nested": {"b": 2, "new": {"d": 2}}}
+
+    assert result["untouched"] is base["untouched"]
+    assert result["nested"]["sibling"] is base["nested"]["sibling"]
+    assert result["nested"]["new"] is overlay["nested"]["new"]
+    assert result["nested"] is not base["nested"]
+
+
+def test_merged_copies_once_per_stack() -> None:
+    """Merging several overlays at once gives the same result as merging them one by one, copying each changed
+    mapping only once."""
+    base = {"nested": {"a": 0, "b": 0, "c": 0}, "other": {"d": 0}}
+    overlays = [{"nested": {"a": 1, "b": 1}}, {"nested": {"a": 2}}, {"new": {"e": 2}}]
+
+    result = merged(base, *overlays)
+    assert result == merged(merged(merged(base, overlays[0]), overlays[1]), overlays[2])
+    assert result == {"nested": {"a": 2, "b": 1, "c": 0}, "other": {"d": 0}, "new": {"e": 2}}
+    assert base == {"nested": {"a": 0, "b": 0, "c": 0}, "other": {"d": 0}}
+    assert overlays == [{"nested": {"a": 1, "b": 1}}, {"nested": {"a": 2}}, {"new": {"e": 2}}]
+    assert result["other"] is base["other"]
+    assert result["new"] is overlays[2]["new"]
+
+
+def test_walk_directory_depth(tmp_path: Path) -> None:
+    """Only the YAML files are listed, and max_depth leaves out the deeper folders."""
+    (tmp_path / "pkg" / "nested").mkdir(parents=True)
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / "top.yaml").write_text("a: 1\n")
+    (tmp_path / "pkg" / "params.yml").write_text("a: 1\n")
+    (tmp_path / "pkg" / "notes.txt").write_text("")
+    (tmp_path / "pkg" / "nested" / "params.yaml").write_text("a: 1\n")
+
+    full = {"__files": ["top.yaml"], "pkg": {"__files": ["params.yml"], "nested": {"__files": ["params.yaml"]}}}
+    assert walk_directory(tmp_path) == full
+    shallow = {"__files": ["top.yaml"], "pkg": {"__files": ["params.yml"]}}
+    assert walk_directory(tmp_path, max_depth=1) == shallow
+    assert walk_directory(tmp_path, max_depth=0) == {"__files": ["top.yaml"]}
@@ -0,0 +1,97 @@
+#  ------------------------------------------------------------------
+#   Copyright 2024 Karelics Oy
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#  ------------------------------------------------------------------
+"""Tests for re-resolving configurations when the files they depend on change."""
+import os
+import threading
+from pathlib import Path
+from unittest import mock
+
+# Parameter Configuration
+from param_configuration.config_layers.file_location_layer import FileLocationLayer
+from param_configuration.configuration import Configuration
+from param_configuration.watch import ConfigWatcher
+
+
+def touch(path: Path, text: str) -> None:
+    """Writes the file and makes sure that its modification time changes."""
+    previous = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+def test_changed_include_reparses_only_affected_documents(tmp_path: Path) -> None:
+    """Only the documents resolved from the changed file are parsed again."""
+    first = tmp_path / "first.yaml"
+    touch(first, "value: 1\n")
+    second = tmp_path / "second.yaml"
+    touch(second, "value: 2\n")
+    main = tmp_path / "main.yaml"
+    touch(main, f"first: !include {first}\nsecond: !include {second}\n")
+
+    watcher = ConfigWatcher(main, config_layers=[])
+    assert watcher.resolve() == {"first": {"value": 1}, "second": {"value": 2}}
+    assert watcher.poll() is None
+
+    touch(first, "value: 3\n")
+    # pylint: disable=protected-access
+    with mock.patch.object(Configuration, "_parse", autospec=True, side_effect=Configuration._parse) as parse:
+        assert watcher.poll() == {"first": {"value": 3}, "second": {"value": 2}}
+    assert sorted(str(call.args[1]) for call in parse.call_args_list) == [str(first), str(main)]
+
+
+def test_new_overlay_file_resolves_again(tmp_path: Path) -> None:
+    """Adding a file to an upper layer is noticed even though the file was not a dependency before."""
+    (tmp_path / "model").mkdir()
+    (tmp_path / "device").mkdir()
+    touch(tmp_path / "model" / "params.yaml", "var_1: model\nvar_2: model\n")
+    layers = [
+        FileLocationLayer(layer_folder="device", config_directory=tmp_path),
+        FileLocationLayer(layer_folder="model", config_directory=tmp_path),
+    ]
+
+    watcher = ConfigWatcher("config://params.yaml", config_layers=layers)
+    assert watcher.resolve() == {"var_1": "model", "var_2": "model"}
+
+    touch(tmp_path / "device" / "params.yaml", "!overlay\nvar_1: device\n")
+    assert watcher.poll() == {"var_1": "device", "var_2": "model"}
+
+
+def test_changed_env_variable_resolves_again(tmp_path: Path) -> None:
+    """Changing an environment variable read by !eval resolves the configuration again."""
+    main = tmp_path / "main.yaml"
+    touch(main, "value: !eval env.WATCH_TEST_VAR\n")
+
+    with mock.patch.dict(os.environ, {"WATCH_TEST_VAR": "first"}):
+        watcher = ConfigWatcher(main, config_layers=[])
+        assert watcher.resolve() == {"value": "first"}
+        assert watcher.poll() is None
+    with mock.patch.dict(os.environ, {"WATCH_TEST_VAR": "second"}):
+        assert watcher.poll() == {"value": "second"}
+
+
+def test_watch_calls_callback_until_stopped(tmp_path: Path) -> None:
+    """watch calls the callback with the initial configuration, and returns once stopped."""
+    main = tmp_path / "main.yaml"
+    touch(main, "value: 1\n")
+    stop = threading.Event()
+    results = []
+
+    def callback(data) -> None:
+        results.append(data)
+        stop.set()
+
+    ConfigWatcher(main, config_layers=[]).watch(callback, interval=0.01, stop=stop)
+    assert results == [{"value": 1}]